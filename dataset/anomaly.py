@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Reason rules in the order their labels are joined: (column, comparison, threshold, label).
+REASON_RULES = [
+    ('effort_engagement_score', '<', 1.5, "Very low engagement"),
+    ('burnout_risk', '>', 4, "High burnout risk"),
+    ('peer_complaints', '>=', 3, "High peer complaints"),
+    ('score_delta', '<', -2, "Sharp drop in performance"),
+    ('hr_warnings_1', '==', 1, "Recent HR warning"),
+]
+
+DEFAULT_REASON = "Unusual KPI pattern"
+NO_ANOMALY = "No anomaly"
+
+_COMPARISONS = {
+    '<': np.less,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+}
+
+
+def _build_reason_table():
+    # Every combination of fired rules maps to a bit code, so reasons can be looked up per row
+    # from a precomputed table instead of being joined row by row.
+    table = []
+    for code in range(1 << len(REASON_RULES)):
+        labels = [rule[3] for bit, rule in enumerate(REASON_RULES) if code & (1 << bit)]
+        table.append(', '.join(labels) if labels else DEFAULT_REASON)
+    return np.array(table, dtype=object)
+
+
+REASON_TABLE = _build_reason_table()
+
+
+class AnomalyDetectorWithReason:
+    """
+    Isolation-forest wrapper that flags anomalies and explains them with simple KPI rules.
+    The attribute layout (model, features, scaler) matches anomaly_detector_with_reason.pkl,
+    so the shipped pickle loads into this class unchanged.
+    """
+
+    def __init__(self, base_model, features, scaler=None):
+        self.model = base_model
+        self.features = features
+        self.scaler = scaler
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('scaler', None)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def decision_function(self, X):
+        return self.model.decision_function(X)
+
+    def explain_reason(self, row):
+        reasons = []
+        for col, op, threshold, label in REASON_RULES:
+            if col in row and _COMPARISONS[op](row[col], threshold):
+                reasons.append(label)
+        return ', '.join(reasons) if reasons else DEFAULT_REASON
+
+    def _reason_codes(self, X, columns):
+        codes = np.zeros(X.shape[0], dtype=np.int64)
+        index = {name: i for i, name in enumerate(columns)}
+        for bit, (col, op, threshold, _) in enumerate(REASON_RULES):
+            i = index.get(col)
+            if i is None:
+                continue
+            with np.errstate(invalid='ignore'):
+                fired = _COMPARISONS[op](X[:, i], threshold)
+            codes |= fired.astype(np.int64) << bit
+        return codes
+
+    def predict_with_reason(self, X):
+        """
+        Scores a batch with a single decision_function pass and explains flagged rows.
+        X is either a DataFrame or a 2D array whose columns follow self.features.
+        Returns (flags, scores, reasons) where flags are -1 for anomalies and 1 otherwise.
+        """
+        if isinstance(X, pd.DataFrame):
+            columns = list(X.columns)
+            X = X.to_numpy(dtype=np.float32)
+        else:
+            columns = self.features
+            X = np.asarray(X, dtype=np.float32)
+
+        scores = self.model.decision_function(X)
+        # IsolationForest.predict is defined as decision_function < 0, so flags come from the same pass.
+        flags = np.where(scores < 0, -1, 1)
+
+        reasons = np.where(flags == -1, REASON_TABLE[self._reason_codes(X, columns)], NO_ANOMALY)
+        return flags, scores, reasons.tolist()
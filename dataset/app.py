@@ -1,17 +1,39 @@
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import create_access_token, JWTManager
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, stream_with_context
 import os
 import numpy as np
 import pandas as pd
-import joblib
-from werkzeug.utils import secure_filename
 from preprocess import preprocess_data # Assuming preprocess.py is still used for model input preparation
+from prediction_cache import create_prediction_cache, fingerprint_inputs
+from response_cache import create_response_cache
+from single_flight import SingleFlight
+from csv_ingest import MultipartFileStream, RawBodyStream, UploadProgress, ingest_csv
+from model_registry import ModelRegistry
+from model_manager import ModelManager
+from summary_jobs import SummaryJobQueue, PENDING
+from summary_cache import SummaryCache
+from batch_summarizer import BatchSummarizer
+from chat_context_cache import ChatContextCache
+from llm_limiter import create_llm_limiter, RateLimitTimeout
+from intent_router import IntentRouter, DATA_INTENTS, LLM
+from db_indexes import ensure_indexes
+from credentials import CredentialsDirectory
+from dashboard_pipeline import dashboard_summary
+from insights_store import InsightsStore
+from personnel_pages import parse_fields, fetch_personnel_page, iter_personnel, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ROLE_FILTERS
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from local_summarizer import summarize_feedback_locally
 import google.generativeai as genai
 import time
+import threading
+import uuid
+import json
 from flask_cors import CORS
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId # For handling MongoDB _id fields
 from textblob import TextBlob # Required for sentiment analysis in KPIs
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
@@ -34,9 +56,6 @@ DEV_MODE = False
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
-# Configuration for file uploads
-UPLOAD_FOLDER = './uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # --- MongoDB Configuration (This part is already correct!) ---
 # This code correctly uses the MONGO_URI from your environment variables,
@@ -52,6 +71,50 @@ employees_collection = db['employees']
 staging_collection = db['staging_employees']
 tasks_collection = db['tasks']
 
+# Create the indexes the routes below rely on (idempotent; see db_indexes.py for the query audit).
+ensure_indexes(db)
+
+# Version of the identity claims put into access tokens. Tokens carrying another version (or none)
+# fall back to reading the manager from Mongo; bump JWT_CLAIMS_VERSION to distrust every issued token.
+CLAIMS_VERSION = int(os.getenv('JWT_CLAIMS_VERSION', 1))
+
+def manager_identity():
+    """
+    Returns (manager ObjectId, manager name) for the logged-in user. Read from the signed token
+    claims when their version is current, otherwise from manager_users. (None, None) when the
+    user is not a manager.
+    """
+    claims = get_jwt()
+    if claims.get('claims_version') == CLAIMS_VERSION and claims.get('manager_id') and claims.get('manager_name'):
+        return ObjectId(claims['manager_id']), claims['manager_name']
+    manager = manager_users_collection.find_one({'employee_id': get_jwt_identity()}, {'name': 1})
+    if not manager:
+        return None, None
+    return manager['_id'], manager.get('name')
+
+# Email-indexed login directory mirrored from hr_users / manager_users / employee_users.
+# Accounts not in it yet are synced on their first login; `python credentials.py backfill` fills
+# it in one go (run it once per deployment, not from every worker at startup).
+credentials_directory = CredentialsDirectory(db, bcrypt)
+
+# Running sums/counts behind /api/insights, kept current by every write to employees_collection
+# and fully recomputed every INSIGHTS_REBUILD_INTERVAL seconds (0 disables the periodic rebuild).
+insights_store = InsightsStore(db, employees_collection)
+if insights_store.is_empty() and employees_collection.estimated_document_count() > 0:
+    print(f"✅ Insights aggregates built ({insights_store.rebuild()} groups)")
+INSIGHTS_REBUILD_INTERVAL = int(os.getenv('INSIGHTS_REBUILD_INTERVAL', 3600))
+
+# Whole-response cache for the polled dashboard reads, keyed by per-collection version counters
+# kept in Mongo (or Redis) so every worker and the maintenance scripts see the same versions.
+# Routes that write a collection call response_cache.bump(<collection name>) after the write.
+response_cache = create_response_cache(db)
+
+# Identical dashboard requests that miss the cache for the same ETag share one computation.
+request_coalescer = SingleFlight(wait_timeout=int(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', 60)))
+if INSIGHTS_REBUILD_INTERVAL > 0:
+    insights_store.rebuild_periodically(INSIGHTS_REBUILD_INTERVAL,
+                                        on_rebuild=lambda: response_cache.bump(insights_store.collection.name))
+
 # DEPLOYMENT FIX: CRITICAL SECURITY - Remove hardcoded API keys.
 # Get your Gemini API key from an environment variable.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -60,6 +123,19 @@ if not GEMINI_API_KEY:
 genai.configure(api_key=GEMINI_API_KEY)
 gemini_model = genai.GenerativeModel('models/gemini-1.5-flash')
 
+# Every Gemini call goes through one token bucket (GEMINI_RATE_PER_MINUTE, bursting to GEMINI_BURST).
+# Set GEMINI_LIMITER_REDIS_URL to share the bucket between workers. Waiting calls are served in lane
+# order (chat, then report, then bulk); chat and report callers give up after a bounded wait.
+llm_limiter = create_llm_limiter(
+    rate_per_minute=float(os.getenv('GEMINI_RATE_PER_MINUTE', 15)),
+    burst=float(os.getenv('GEMINI_BURST', 5)),
+    redis_url=os.getenv('GEMINI_LIMITER_REDIS_URL'),
+    lane_timeouts={'chat': 30, 'report': 300},
+    max_retries=int(os.getenv('GEMINI_MAX_RETRIES', 4)),
+    backoff_base=float(os.getenv('GEMINI_BACKOFF_BASE', 2)),
+    backoff_max=float(os.getenv('GEMINI_BACKOFF_MAX', 60))
+)
+
 
 # --- ALL YOUR ROUTES AND FUNCTIONS ---
 # The logic inside your routes is great and doesn't need to be changed.
@@ -81,34 +157,80 @@ def chatbot_query():
     if not emp_id:
         return jsonify({'error': 'Invalid authentication token.'}), 422
 
-    employee = employees_collection.find_one({"employee_id": emp_id})
-    if not employee:
+    # Greetings, refusals and plain score lookups are answered locally without calling Gemini.
+    intent, _ = intent_router.classify(query)
+    if intent != LLM and intent not in DATA_INTENTS:
+        return jsonify({'response': intent_router.respond(intent), 'intent': intent})
+
+    chat_context = employee_chat_context(emp_id)
+    if not chat_context:
         return jsonify({"error": f"Performance data for employee ID {emp_id} not found."}), 404
 
-    employee_data = pd.DataFrame([employee])
-    promo_input_cols = [col for col in promotion_features if col in employee_data.columns]
-    attrition_input_cols = [col for col in attrition_features if col in employee_data.columns]
+    if intent in DATA_INTENTS:
+        return jsonify({'response': intent_router.respond(intent, chat_context), 'intent': intent})
 
-    promo_input = employee_data[promo_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-    attrition_input = employee_data[attrition_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-    
-    for feature in promotion_features:
-        if feature not in promo_input.columns: promo_input[feature] = 0
-    for feature in attrition_features:
-        if feature not in attrition_input.columns: attrition_input[feature] = 0
+    prompt = build_chatbot_prompt(chat_context, query)
 
-    promo_input = promo_input[promotion_features]
-    attrition_input = attrition_input[attrition_features]
-    
-    promo_score = promotion_model.predict(promo_input)[0]
-    attr_class = attrition_model.predict(attrition_input)[0]
-    attr_label = label_encoder.inverse_transform([attr_class])[0]
-    
-    promotion_results = format_promotion_result(employee.get("name"), promo_score)
-    attrition_results = format_attrition_result(employee.get("name"), attr_label)
-    
-    prompt = f"""
-    You are EvalMate, an expert, empathetic AI HR assistant for an employee named {employee.get("name", "N/A")}.
+    print("\n" + "="*50)
+    print("PROMPT BEING SENT TO GEMINI AI:")
+    print("="*50)
+    print(prompt)
+    print("="*50 + "\n")
+
+    try:
+        response = llm_limiter.call(gemini_model.generate_content, prompt, lane='chat')
+        return jsonify({'response': response.text.strip()})
+    except RateLimitTimeout:
+        return jsonify({'error': 'EvalMate is busy right now. Please try again in a moment.'}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Local intent router in front of the chatbot (CHAT_INTENT_THRESHOLD = minimum model confidence).
+intent_router = IntentRouter(threshold=float(os.getenv('CHAT_INTENT_THRESHOLD', 0.6)))
+
+# Rendered chatbot context per employee (CHAT_CONTEXT_TTL seconds), dropped on employee writes.
+chat_context_cache = ChatContextCache(ttl_seconds=int(os.getenv('CHAT_CONTEXT_TTL', 300)))
+
+def employee_chat_context(emp_id):
+    """
+    Returns the employee's chatbot context: name, formatted promotion/attrition results and the
+    rendered PERFORMANCE DATA block. Served from chat_context_cache when possible; None if the
+    employee does not exist.
+    """
+    chat_context = chat_context_cache.get(emp_id)
+    if chat_context is not None:
+        return chat_context
+
+    employee = employees_collection.find_one({"employee_id": emp_id})
+    if not employee:
+        return None
+
+    predictions = predict_employee(employee, employees_collection)
+    promotion_results = format_promotion_result(employee.get("name"), predictions['promotion_score'])
+    attrition_results = format_attrition_result(employee.get("name"), predictions['attrition_label'])
+    chat_context = {
+        'name': employee.get("name", "N/A"),
+        'promotion': promotion_results,
+        'attrition': attrition_results,
+        'context': f"""
+    - Employee Name: {employee.get("name", "N/A")}
+    - Promotion Readiness Score: {promotion_results['score']}
+    - Promotion Readiness Level: {promotion_results['level']}
+    - Promotion Recommendation: {promotion_results['recommendation']}
+    - Attrition Risk Level: {attrition_results['risk_level']}
+    - Attrition Risk Recommendation: {attrition_results['recommendation']}
+    - Manager's Comments Summary: "{employee.get("manager_comments", "No comments provided.")}"
+    - Peer Review Summary: "{employee.get("peer_reviews", "No comments provided.")}"
+    - Key KPI Scores (if available): {employee.get('kpi_scores', 'Not available')}"""
+    }
+    chat_context_cache.set(emp_id, chat_context)
+    return chat_context
+
+def build_chatbot_prompt(chat_context, query):
+    promotion_results = chat_context['promotion']
+    attrition_results = chat_context['attrition']
+    return f"""
+    You are EvalMate, an expert, empathetic AI HR assistant for an employee named {chat_context['name']}.
     Your tone is professional, encouraging, and helpful.
 
     **YOUR TASK:**
@@ -131,16 +253,7 @@ def chatbot_query():
         
     5. **General Formatting**: Never use raw database field names. Always use a conversational tone.
 
-    **--- PERFORMANCE DATA FOR CONTEXT ---**
-    - Employee Name: {employee.get("name", "N/A")}
-    - Promotion Readiness Score: {promotion_results['score']}
-    - Promotion Readiness Level: {promotion_results['level']}
-    - Promotion Recommendation: {promotion_results['recommendation']}
-    - Attrition Risk Level: {attrition_results['risk_level']}
-    - Attrition Risk Recommendation: {attrition_results['recommendation']}
-    - Manager's Comments Summary: "{employee.get("manager_comments", "No comments provided.")}"
-    - Peer Review Summary: "{employee.get("peer_reviews", "No comments provided.")}"
-    - Key KPI Scores (if available): {employee.get('kpi_scores', 'Not available')}
+    **--- PERFORMANCE DATA FOR CONTEXT ---**{chat_context['context']}
 
     **--- EMPLOYEE'S QUERY ---**
     "{query}"
@@ -148,17 +261,87 @@ def chatbot_query():
     Now, generate the single, most appropriate response following all the rules above.
     """
 
-    print("\n" + "="*50)
-    print("PROMPT BEING SENT TO GEMINI AI:")
-    print("="*50)
-    print(prompt)
-    print("="*50 + "\n")
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
 
-    try:
-        response = gemini_model.generate_content(prompt)
-        return jsonify({'response': response.text.strip()})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+def cancel_gemini_stream(response):
+    """Best-effort cancel of an in-flight streaming generate_content call (gRPC or REST transport)."""
+    iterator = getattr(response, '_iterator', None)
+    for method in ('cancel', 'close'):
+        stop = getattr(iterator, method, None)
+        if callable(stop):
+            try:
+                stop()
+            except Exception:
+                pass
+            return
+
+@app.route('/api/chatbot-query/stream', methods=['POST'])
+@jwt_required()
+def chatbot_query_stream():
+    """
+    Server-sent events variant of chatbot_query. Emits a 'metadata' event with the intent (plus
+    the employee's promotion and attrition levels when the answer needs their data), then one
+    'token' event per chunk of Gemini output, and finally 'done' (or 'error'). If the client
+    disconnects mid-answer the upstream Gemini stream is cancelled.
+    """
+    data = request.get_json() or {}
+    query = data.get('query', '').strip()
+    if not query:
+        return jsonify({'error': 'Empty query'}), 400
+
+    emp_id = get_jwt_identity()
+    if not emp_id:
+        return jsonify({'error': 'Invalid authentication token.'}), 422
+
+    # As in chatbot_query: greetings and refusals need neither the employee's context nor Gemini.
+    intent, _ = intent_router.classify(query)
+    chat_context = None
+    if intent == LLM or intent in DATA_INTENTS:
+        chat_context = employee_chat_context(emp_id)
+        if not chat_context:
+            return jsonify({"error": f"Performance data for employee ID {emp_id} not found."}), 404
+    prompt = build_chatbot_prompt(chat_context, query) if intent == LLM else None
+
+    def events():
+        metadata = {'intent': intent}
+        if chat_context is not None:
+            metadata.update({
+                'promotion_score': chat_context['promotion']['score'],
+                'promotion_level': chat_context['promotion']['level'],
+                'attrition_risk_level': chat_context['attrition']['risk_level'],
+            })
+        yield sse_event('metadata', metadata)
+        if intent != LLM:
+            yield sse_event('token', {'text': intent_router.respond(intent, chat_context)})
+            yield sse_event('done', {})
+            return
+        if DEV_MODE:
+            yield sse_event('token', {'text': "This is a sample response from development mode. The real AI is not being called."})
+            yield sse_event('done', {})
+            return
+
+        response = None
+        finished = False
+        try:
+            response = llm_limiter.call(gemini_model.generate_content, prompt, stream=True, lane='chat')
+            for chunk in response:
+                text = getattr(chunk, 'text', '')
+                if text:
+                    yield sse_event('token', {'text': text})
+            finished = True
+            yield sse_event('done', {})
+        except Exception as e:
+            finished = True
+            yield sse_event('error', {'error': str(e)})
+        finally:
+            # Reached without finishing only when the client went away (GeneratorExit on yield).
+            if response is not None and not finished:
+                print(f"ℹ️ Chat stream for {emp_id} closed by client, cancelling Gemini request.")
+                cancel_gemini_stream(response)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # ... Paste the rest of your routes here, they do not need modification for deployment ...
 # (generate_report_from_dashboard, assign_task, update_task_status, etc.)
@@ -196,11 +379,11 @@ def generate_report_from_dashboard():
 
         # Rule 2: Managers can access reports for their direct reports.
         if not has_permission and user_role == 'Manager':
-            manager_doc = db.manager_users.find_one({'employee_id': current_user_id}, {'name': 1})
+            _, manager_name = manager_identity()
             
             # --- START: ROBUST CHECK & DEBUGGING ---
-            if manager_doc:
-                manager_name = manager_doc.get('name', '').strip()
+            if manager_name:
+                manager_name = manager_name.strip()
                 employee_reporting_to = target_employee.get('reporting_manager', '').strip()
 
                 # Print values to the terminal for debugging
@@ -226,45 +409,16 @@ def generate_report_from_dashboard():
 
         # If permission is granted, the original logic continues...
         employee_data_dict = target_employee
-        employee_data = pd.DataFrame([employee_data_dict])
-        
-        # ... (the rest of the function remains the same) ...
-        # Prepare inputs for all models
-        promo_input_cols = [col for col in promotion_features if col in employee_data.columns]
-        attrition_input_cols = [col for col in attrition_features if col in employee_data.columns]
-        anomaly_input_cols = [col for col in anomaly_features if col in employee_data.columns]
-
-        promo_input = employee_data[promo_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-        attrition_input = employee_data[attrition_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-        anomaly_input = employee_data[anomaly_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-        # Ensure all feature columns exist
-        for feature in promotion_features:
-            if feature not in promo_input.columns: promo_input[feature] = 0
-        for feature in attrition_features:
-            if feature not in attrition_input.columns: attrition_input[feature] = 0
-        for feature in anomaly_features:
-            if feature not in anomaly_input.columns: anomaly_input[feature] = 0
-        
-        promo_input = promo_input[promotion_features]
-        attrition_input = attrition_input[attrition_features]
-        anomaly_input = anomaly_input[anomaly_features]
-
-        # Run the models
-        flags, scores, reasons = anomaly_model.predict_with_reason(anomaly_input)
-        promo_score = promotion_model.predict(promo_input)[0]
-        attr_class = attrition_model.predict(attrition_input)[0]
-        attr_label = label_encoder.inverse_transform([attr_class])[0]
-        anomaly_score = scores[0]
-        reason = reasons[0]
-
-        # Summarize feedback with Gemini
-        feedback_text = "\n".join([
-            f"{col.replace('_', ' ').title()}: {employee_data_dict.get(col, '')}"
-            for col in ['manager_comments', 'hr_notes', 'peer_reviews', 'client_feedback']
-            if employee_data_dict.get(col) and str(employee_data_dict.get(col)).strip()
-        ])
-        feedback_summary = summarize_feedback_gemini(feedback_text) if feedback_text.strip() else "No feedback provided."
+
+        # Run the models (served from stored or cached predictions when the document is unchanged)
+        predictions = predict_employee(employee_data_dict, employees_collection)
+        promo_score = predictions['promotion_score']
+        attr_label = predictions['attrition_label']
+        anomaly_score = predictions['anomaly_score']
+        reason = predictions['anomaly_reason']
+
+        # Summarize feedback with Gemini in the background; the client fetches it by job id
+        feedback = start_feedback_summary(employee_data_dict, "No feedback provided.")
 
         # Format the final results
         promo_result = format_promotion_result(employee_name, promo_score)
@@ -290,7 +444,7 @@ def generate_report_from_dashboard():
             'promotion': promo_result,
             'attrition': format_attrition_result(employee_name, attr_label),
             'anomaly': format_anomaly_result(anomaly_score, reason),
-            'feedback_summary': feedback_summary
+            **feedback
         }
 
         return jsonify(result_data), 200
@@ -300,6 +454,169 @@ def generate_report_from_dashboard():
         traceback.print_exc()
         return jsonify({'error': f"An error occurred during prediction: {str(e)}"}), 500
 
+# Upper bound on how many employees a single batch evaluation request may score.
+BATCH_EVALUATION_LIMIT = 5000
+
+@app.route('/api/evaluate/batch', methods=['POST'])
+@jwt_required()
+def evaluate_batch():
+    """
+    Scores many employees in one request with a single predict call per model.
+    Accepts {"employee_ids": [...]} to evaluate records from the 'employees' collection,
+    or {"all_staged": true} to evaluate every record from the latest CSV upload.
+    With "include_summaries": true, feedback is summarized in batched Gemini calls in the
+    background; the response carries one feedback_summary_job_id covering every employee.
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') not in ['HR', 'Manager']:
+            return jsonify({'error': 'Forbidden: You do not have permission to run batch evaluations.'}), 403
+
+        data = request.get_json() or {}
+        employee_ids = data.get('employee_ids') or []
+
+        if data.get('all_staged'):
+            source_collection = staging_collection
+            employee_docs = list(staging_collection.find({}))
+            not_found = []
+        elif employee_ids:
+            if not isinstance(employee_ids, list):
+                return jsonify({'error': 'employee_ids must be a list'}), 400
+            source_collection = employees_collection
+            employee_ids = list(dict.fromkeys(str(emp_id).strip() for emp_id in employee_ids))
+            if len(employee_ids) > BATCH_EVALUATION_LIMIT:
+                return jsonify({'error': f'A batch can contain at most {BATCH_EVALUATION_LIMIT} employees.'}), 400
+            employee_docs = list(employees_collection.find({'employee_id': {'$in': employee_ids}}))
+            found_ids = {doc.get('employee_id') for doc in employee_docs}
+            not_found = [emp_id for emp_id in employee_ids if emp_id not in found_ids]
+        else:
+            return jsonify({'error': 'Provide a list of employee_ids or set all_staged to true'}), 400
+
+        if len(employee_docs) > BATCH_EVALUATION_LIMIT:
+            return jsonify({'error': f'A batch can contain at most {BATCH_EVALUATION_LIMIT} employees.'}), 400
+
+        # Same completeness rule as /search: records without tenure are not ready for evaluation.
+        ready_docs = [doc for doc in employee_docs if doc.get('tenure_in_current_role')]
+        incomplete = [
+            {'employee_id': doc.get('employee_id'), 'name': doc.get('name'),
+             'error': 'Details not filled. The employee record is incomplete.'}
+            for doc in employee_docs if not doc.get('tenure_in_current_role')
+        ]
+
+        results = evaluate_employees(ready_docs, source_collection)
+
+        response = {
+            'results': results,
+            'evaluated': len(results),
+            'incomplete': incomplete,
+            'not_found': not_found
+        }
+        if data.get('include_summaries'):
+            summary_fields, job_id = start_feedback_summaries(ready_docs, "No feedback provided.")
+            for result in results:
+                result.update(summary_fields.get(result['employee_id'], {}))
+            response['feedback_summary_job_id'] = job_id
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f"An error occurred during batch prediction: {str(e)}"}), 500
+
+@app.route('/api/admin/models', methods=['GET'])
+@jwt_required()
+def get_model_stats():
+    """
+    Reports the active model set (version, load time and resident size of every artifact),
+    the status of the last reload and the prediction cache counters.
+    Restricted to users with the 'HR' role.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'HR':
+        return jsonify({'error': 'Forbidden: You do not have permission to view model details.'}), 403
+
+    return jsonify(dict(model_manager.status(),
+                        prediction_cache=prediction_cache.stats(),
+                        summary_cache=summary_cache.stats(),
+                        chat_context_cache=chat_context_cache.stats(),
+                        llm_limiter=llm_limiter.stats(),
+                        chat_intents=intent_router.stats(),
+                        summary_jobs=summary_jobs.stats(),
+                        insights_store=insights_store.stats(),
+                        response_cache=response_cache.stats(),
+                        request_coalescing=request_coalescer.stats())), 200
+
+@app.route('/api/admin/models/reload', methods=['POST'])
+@jwt_required()
+def reload_models():
+    """
+    Loads a new model set in the background and swaps it in once it passes a warm-up prediction.
+    Requests already running finish on the models they started with.
+
+    Body (all optional):
+      {"versions": {"promotion_model": "<version>", ...}}  -> switch to already published versions
+      {"from_files": true}                                  -> republish the flat ./models/*.pkl files
+    With an empty body the registry's CURRENT versions are reloaded.
+    Restricted to users with the 'HR' role.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'HR':
+        return jsonify({'error': 'Forbidden: You do not have permission to reload models.'}), 403
+
+    try:
+        data = request.get_json(silent=True) or {}
+        versions = data.get('versions') or {}
+        unknown = [name for name in versions if name not in LEGACY_MODEL_SOURCES]
+        if unknown:
+            return jsonify({'error': f"Unknown model name(s): {', '.join(unknown)}"}), 400
+        sources = LEGACY_MODEL_SOURCES if data.get('from_files') else None
+
+        if model_manager.reload_status.get('state') == 'loading':
+            return jsonify({'error': 'A model reload is already in progress.'}), 409
+        model_manager.reload_in_background(versions, sources)
+        return jsonify({'message': 'Model reload started.', 'active_generation': model_manager.current().generation}), 202
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f"Failed to start model reload: {str(e)}"}), 500
+
+@app.route('/api/summaries/<job_id>', methods=['GET'])
+def get_feedback_summary(job_id):
+    """
+    Returns the state of a feedback summary job: {'job_id', 'status', 'feedback_summary'}.
+    Status is 'pending', 'done' or 'failed'. The job id itself is the access token.
+    """
+    job = summary_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Summary job not found or expired.'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/summaries/<job_id>/stream', methods=['GET'])
+def stream_feedback_summary(job_id):
+    """
+    Server-sent events variant of get_feedback_summary: sends keep-alive comments while the job
+    is pending and a single 'summary' event once it has finished.
+    """
+    if summary_jobs.get(job_id) is None:
+        return jsonify({'error': 'Summary job not found or expired.'}), 404
+
+    def events():
+        deadline = time.monotonic() + SUMMARY_STREAM_TIMEOUT
+        while True:
+            job = summary_jobs.wait(job_id, timeout=15)
+            if job is None or job['status'] != PENDING:
+                yield f"event: summary\ndata: {json.dumps(job)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps(job)}\n\n"
+                return
+            yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/manager/assign-task', methods=['POST'])
 @jwt_required()
 def assign_task():
@@ -315,13 +632,10 @@ def assign_task():
         if not all(field in data for field in required_fields):
             return jsonify({'error': 'Missing required task fields'}), 400
 
-        # --- Get Manager Info ---
-        manager = manager_users_collection.find_one({'employee_id': manager_emp_id})
-        if not manager:
+        # --- Get Manager Info (from the token claims, or Mongo for older tokens) ---
+        manager_id_obj, manager_name = manager_identity() # manager_id_obj is the manager's ObjectId
+        if not manager_id_obj:
             return jsonify({'error': 'Manager not found or you do not have permission'}), 403
-        
-        manager_id_obj = manager['_id'] # The ObjectId of the manager
-        manager_name = manager['name']
 
         # --- Prepare Task Document ---
         base_task = {
@@ -510,16 +824,12 @@ def get_manager_team():
         if not manager_emp_id:
             return jsonify({'error': 'Manager Employee ID not found in token'}), 400
 
-        # 2. Find the manager in the 'manager_users' collection by their 'employee_id' to get their name.
-        manager = db.manager_users.find_one(
-            {'employee_id': manager_emp_id},
-            {'name': 1}  # We only need the manager's name.
-        )
+        # 2. Get the manager's name from the token claims (falls back to 'manager_users' for older tokens).
+        manager_id_obj, manager_name = manager_identity()
 
-        if not manager:
+        if not manager_id_obj:
             return jsonify({'error': 'Access denied: Logged-in user is not a valid manager.'}), 403
 
-        manager_name = manager.get('name')
         if not manager_name:
              return jsonify({'error': 'Could not determine the name of the logged-in manager.'}), 404
 
@@ -551,6 +861,7 @@ def get_manager_team():
 # Add this new route to app.py to provide a list of managers
 
 @app.route('/api/managers', methods=['GET'])
+@response_cache.cached('managers', ['manager_users'])
 def get_all_managers():
     """
     Fetches a list of all users with the 'Manager' role.
@@ -584,32 +895,23 @@ def login_user():
     if not email or not password:
         return jsonify({"error": "Email and password are required"}), 400
 
-    user = None
-    # --- MODIFICATION START: Determine collection and role ---
-    # We check HR users first, as they should have the highest privilege.
-    collections_to_search = {
-        'hr_users': 'HR',
-        'manager_users': 'Manager',
-        'employee_users': 'Employee'
-    }
-    
-    user_role = None
-    for collection_name, role in collections_to_search.items():
-        user = db[collection_name].find_one({"email": email})
-        if user:
-            user_role = role
-            break
-    # --- MODIFICATION END ---
-
-    if not user or not bcrypt.check_password_hash(user["password"], password):
+    # One indexed lookup resolves the account and its role (HR wins over Manager over Employee).
+    # Accounts created outside the app are picked up from the role collections and synced.
+    user = credentials_directory.resolve(email)
+    if not user or not user.get("password") or not credentials_directory.check_password(user["password"], password):
         return jsonify({"error": "Invalid credentials"}), 401
+    user_role = user.get("role")
 
     employee_id_for_token = user.get("employee_id")
     if not employee_id_for_token:
         return jsonify({"error": "User account is missing an Employee ID."}), 400
 
     # --- MODIFICATION START: Add role to token's claims ---
-    additional_claims = {"role": user_role}
+    additional_claims = {"role": user_role, "claims_version": CLAIMS_VERSION}
+    if user_role == 'Manager':
+        # Manager routes read these instead of looking the manager up on every request.
+        additional_claims["manager_id"] = str(user.get("user_id") or user["_id"])
+        additional_claims["manager_name"] = user.get("name")
     access_token = create_access_token(
         identity=employee_id_for_token,
         additional_claims=additional_claims
@@ -617,7 +919,7 @@ def login_user():
     # --- MODIFICATION END ---
     
     user_data = {
-        "_id": str(user["_id"]),
+        "_id": str(user.get("user_id") or user["_id"]),
         "name": user.get("name"),
         "email": user.get("email"),
         "role": user_role, # Return the determined role
@@ -626,8 +928,9 @@ def login_user():
 
     return jsonify(success=True, token=access_token, user=user_data), 200
 
-def summarize_feedback_gemini(text, retries=3, delay=60):
-    prompt = f"""
+# Bump SUMMARY_PROMPT_VERSION whenever SUMMARY_PROMPT changes so cached summaries are not reused.
+SUMMARY_PROMPT_VERSION = 'v1'
+SUMMARY_PROMPT = """
     Given the employee feedback below, provide the following:
     1. Sentiment (Positive, Neutral, Negative)
     2. Key themes (e.g., leadership, punctuality, communication)
@@ -636,48 +939,139 @@ def summarize_feedback_gemini(text, retries=3, delay=60):
 
     Feedback: "{text}"
     """
-    for attempt in range(retries):
-        try:
-            response = gemini_model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            if "429" in str(e) and attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                return f"❌ Gemini Error: {str(e)}"
-
-# Define custom class used in the model
-class AnomalyDetectorWithReason:
-    def __init__(self, base_model, features):
-        self.model = base_model
-        self.features = features
-
-    def predict(self, X):
-        return self.model.predict(X)
-
-    def decision_function(self, X):
-        return self.model.decision_function(X)
-
-    def explain_reason(self, row):
-        reasons = []
-        if 'effort_engagement_score' in row and row['effort_engagement_score'] < 1.5:
-            reasons.append("Very low engagement")
-        if 'burnout_risk' in row and row['burnout_risk'] > 4:
-            reasons.append("High burnout risk")
-        if 'peer_complaints' in row and row['peer_complaints'] >= 3:
-            reasons.append("High peer complaints")
-        if 'score_delta' in row and row['score_delta'] < -2:
-            reasons.append("Sharp drop in performance")
-        if 'hr_warnings_1' in row and row['hr_warnings_1'] == 1: # Note: original code has hr_warnings_1, your latest code has hr_warnings. Check consistency.
-            reasons.append("Recent HR warning")
-        return ', '.join(reasons) if reasons else "Unusual KPI pattern"
-
-    def predict_with_reason(self, X_df):
-        flags = self.model.predict(X_df)
-        scores = self.model.decision_function(X_df)
-        reasons = [self.explain_reason(row) if flag == -1 else "No anomaly"
-                   for flag, (_, row) in zip(flags, X_df.iterrows())]
-        return flags, scores, reasons
+
+def gemini_generate(prompt, lane='report', deadline=None):
+    """
+    Sends a prompt to Gemini through the rate limiter (which retries 429s). Raises on failure.
+    `deadline` (time.monotonic()) stops waiting for a slot or a retry once it has passed.
+    """
+    response = llm_limiter.call(gemini_model.generate_content, prompt, lane=lane, deadline=deadline)
+    return response.text.strip()
+
+def summarize_feedback_gemini(text, lane='report', deadline=None):
+    try:
+        return gemini_generate(SUMMARY_PROMPT.format(text=text), lane, deadline)
+    except Exception as e:
+        return f"❌ Gemini Error: {str(e)}"
+
+# Feedback summaries are produced off the request path; reports return a job id instead of waiting.
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', 4))
+SUMMARY_STREAM_TIMEOUT = int(os.getenv('SUMMARY_STREAM_TIMEOUT', 600))
+
+# Summaries are cached by a hash of the normalized feedback text and the prompt version.
+summary_cache = SummaryCache(
+    db['summary_cache'], SUMMARY_PROMPT_VERSION,
+    ttl_seconds=int(os.getenv('SUMMARY_CACHE_TTL', 30 * 24 * 3600)),
+    max_entries=int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', 50000))
+)
+
+# Longest a report waits for Gemini before falling back to the local TextBlob summary.
+SUMMARY_DEADLINE_SECONDS = float(os.getenv('SUMMARY_DEADLINE_SECONDS', 20))
+# Gemini summary calls run here, so a job can stop waiting at its deadline while the call finishes.
+# Calls are only submitted while a thread is free; nothing queues behind a slow call.
+GEMINI_CALL_SLOTS = SUMMARY_WORKERS * 2
+gemini_call_executor = ThreadPoolExecutor(max_workers=GEMINI_CALL_SLOTS, thread_name_prefix='gemini')
+gemini_call_slots = threading.BoundedSemaphore(GEMINI_CALL_SLOTS)
+
+def cache_summary(text, summary):
+    if not summary.startswith('❌'):  # errors are retried on the next report, not cached
+        summary_cache.set(text, summary)
+
+def summarize_and_cache(text):
+    """
+    Summarizes with Gemini but waits at most SUMMARY_DEADLINE_SECONDS. On expiry, a Gemini error
+    or when every Gemini thread is busy, the local summary (same four fields) is returned instead
+    and is not cached. The deadline is passed down to the rate limiter, so the Gemini thread stops
+    waiting for a slot (or a retry) when the job does; an answer whose request was already under
+    way is still cached for the next report.
+    """
+    if not gemini_call_slots.acquire(blocking=False):
+        print("ℹ️ All Gemini summary threads are busy, using the local summary.")
+        return summarize_feedback_locally(text)
+
+    def on_done(done):
+        gemini_call_slots.release()
+        if done.exception() is None:
+            cache_summary(text, done.result())
+
+    deadline = time.monotonic() + SUMMARY_DEADLINE_SECONDS
+    try:
+        future = gemini_call_executor.submit(summarize_feedback_gemini, text, 'report', deadline)
+    except RuntimeError:
+        gemini_call_slots.release()
+        raise
+    future.add_done_callback(on_done)
+    try:
+        summary = future.result(timeout=SUMMARY_DEADLINE_SECONDS)
+    except FuturesTimeout:
+        print(f"ℹ️ Gemini summary exceeded {SUMMARY_DEADLINE_SECONDS}s, using the local summary.")
+        return summarize_feedback_locally(text)
+    if summary.startswith('❌'):
+        print(f"ℹ️ Using the local summary after a Gemini failure: {summary}")
+        return summarize_feedback_locally(text)
+    return summary
+
+summary_jobs = SummaryJobQueue(summarize_and_cache, db['summary_jobs'], max_workers=SUMMARY_WORKERS)
+
+# Bulk runs pack several employees into one Gemini prompt, up to this many estimated input tokens.
+# The batch prompt asks for the same four fields, so its answers share the summary cache.
+batch_summarizer = BatchSummarizer(
+    partial(gemini_generate, lane='bulk'), partial(summarize_feedback_gemini, lane='bulk'),
+    token_budget=int(os.getenv('SUMMARY_BATCH_TOKEN_BUDGET', 6000)),
+    max_items=int(os.getenv('SUMMARY_BATCH_MAX_ITEMS', 20))
+)
+
+def summarize_many_and_cache(texts_by_employee):
+    """Job body for bulk runs: {employee_id: feedback text} -> {employee_id: summary}."""
+    unique_texts = {text: text for text in set(texts_by_employee.values())}
+    summaries = batch_summarizer.summarize_many(unique_texts)
+    for text, summary in summaries.items():
+        cache_summary(text, summary)
+        if summary.startswith('❌'):
+            summaries[text] = summarize_feedback_locally(text)
+    return {emp_id: summaries[text] for emp_id, text in texts_by_employee.items()}
+
+FEEDBACK_COLUMNS = ['manager_comments', 'hr_notes', 'peer_reviews', 'client_feedback']
+
+def build_feedback_text(employee_doc):
+    return "\n".join([
+        f"{col.replace('_', ' ').title()}: {employee_doc.get(col, '')}"
+        for col in FEEDBACK_COLUMNS
+        if employee_doc.get(col) is not None and str(employee_doc.get(col)).strip() != ''
+    ])
+
+def start_feedback_summary(employee_doc, empty_message):
+    """
+    Queues the employee's feedback for summarization and returns the report fields describing it.
+    'feedback_summary' stays null until the job finishes; clients poll /api/summaries/<job_id>
+    or stream /api/summaries/<job_id>/stream for the text.
+    """
+    feedback_text = build_feedback_text(employee_doc)
+    if not feedback_text.strip():
+        return {'feedback_summary': empty_message, 'feedback_summary_status': 'done', 'feedback_summary_job_id': None}
+    cached = summary_cache.get(feedback_text)
+    if cached is not None:
+        return {'feedback_summary': cached, 'feedback_summary_status': 'done', 'feedback_summary_job_id': None}
+    job_id = summary_jobs.submit(feedback_text)
+    return {'feedback_summary': None, 'feedback_summary_status': PENDING, 'feedback_summary_job_id': job_id}
+
+def start_feedback_summaries(employee_docs, empty_message):
+    """
+    Bulk counterpart of start_feedback_summary. Returns ({employee_id: report fields}, job_id);
+    the job's result maps each still-pending employee_id to its summary.
+    """
+    fields, pending = {}, {}
+    for doc in employee_docs:
+        emp_id = doc.get('employee_id')
+        feedback_text = build_feedback_text(doc)
+        cached = summary_cache.get(feedback_text) if feedback_text.strip() else empty_message
+        if cached is not None:
+            fields[emp_id] = {'feedback_summary': cached, 'feedback_summary_status': 'done'}
+        else:
+            fields[emp_id] = {'feedback_summary': None, 'feedback_summary_status': PENDING}
+            pending[emp_id] = feedback_text
+    job_id = summary_jobs.submit(pending, summarize=summarize_many_and_cache) if pending else None
+    return fields, job_id
 
 # Load models and files
 PROMOTION_MODEL_PATH = './models/promotion_model.pkl'
@@ -686,17 +1080,38 @@ LABEL_ENCODER_PATH = './models/label_encoder.pkl'
 PROMOTION_FEATURES_PATH = './models/trained_features.pkl'
 ATTRITION_FEATURES_PATH = './models/trained_features_attr.pkl'
 ANOMALY_MODEL_PATH = './models/anomaly_detector_with_reason.pkl'
-
-promotion_model = joblib.load(PROMOTION_MODEL_PATH)
-promotion_features = joblib.load(PROMOTION_FEATURES_PATH)
-
-attrition_model = joblib.load(ATTRITION_MODEL_PATH)
-attrition_features = joblib.load(ATTRITION_FEATURES_PATH)
-label_encoder = joblib.load(LABEL_ENCODER_PATH)
-import sys
-sys.modules['__main__'].AnomalyDetectorWithReason = AnomalyDetectorWithReason
-anomaly_model = joblib.load(ANOMALY_MODEL_PATH)
-anomaly_features = anomaly_model.features
+MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', './models/registry')
+LEGACY_MODEL_SOURCES = {
+    'promotion_model': PROMOTION_MODEL_PATH,
+    'promotion_features': PROMOTION_FEATURES_PATH,
+    'attrition_model': ATTRITION_MODEL_PATH,
+    'attrition_features': ATTRITION_FEATURES_PATH,
+    'label_encoder': LABEL_ENCODER_PATH,
+    'anomaly_model': ANOMALY_MODEL_PATH,
+}
+
+# The flat pickles above are published into the versioned registry the first time the app starts.
+# Models are then loaded from the registry, with their tree node tables memory-mapped so that
+# forked gunicorn workers share the same pages.
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
+model_registry.import_legacy(LEGACY_MODEL_SOURCES)
+
+# Models, feature lists and the feature assembler are held together in one ModelSet that can be
+# swapped at runtime (POST /api/admin/models/reload, or MODEL_WATCH_INTERVAL seconds of polling).
+model_manager = ModelManager(model_registry)
+model_manager.activate(model_manager.load())
+MODEL_WATCH_INTERVAL = int(os.getenv('MODEL_WATCH_INTERVAL', 0))
+if MODEL_WATCH_INTERVAL > 0:
+    model_manager.watch(LEGACY_MODEL_SOURCES, MODEL_WATCH_INTERVAL)
+
+
+# Per-employee prediction cache (in-process LRU, or Redis when PREDICTION_CACHE_REDIS_URL is set).
+prediction_cache = create_prediction_cache()
+
+def invalidate_employee_caches(emp_id):
+    """Called by every route that changes an employee document."""
+    prediction_cache.invalidate(emp_id)
+    chat_context_cache.invalidate(emp_id)
 
 # Formatting functions
 def format_promotion_result(employee_name, promo_score):
@@ -771,52 +1186,232 @@ def format_anomaly_result(score, reason):
         'icon': icon
     }
 
+def build_kpi_scores(employee_doc):
+    kpi_scores = {
+        'Leadership': employee_doc.get('leadership_score'),
+        'Integrity Feedback': employee_doc.get('integrity_feedback_score'),
+        'Collaboration & Communication': employee_doc.get('collaboration_communication_score'),
+        'Adaptability & Growth': employee_doc.get('adaptability_growth_score'),
+        'Skill Development': employee_doc.get('skill_development_score'),
+        'Effort & Engagement': employee_doc.get('effort_engagement_score')
+    }
+    return {k: v for k, v in kpi_scores.items() if v is not None}
+
+def run_anomaly_model(models, anomaly_input):
+    # anomaly_input columns follow anomaly_features, which is what the detector's reason rules expect.
+    return models.anomaly_model.predict_with_reason(anomaly_input)
+
+def run_models(models, promo_input, attrition_input, anomaly_input):
+    """Runs all three models over input matrices of any batch size and returns one predictions dict per row."""
+    promo_scores = models.promotion_model.predict(promo_input)
+    attr_labels = models.label_encoder.inverse_transform(models.attrition_model.predict(attrition_input))
+    _, anomaly_scores, reasons = run_anomaly_model(models, anomaly_input)
+    return [
+        {
+            'promotion_score': float(promo_scores[i]),
+            'attrition_label': str(attr_labels[i]),
+            'anomaly_score': float(anomaly_scores[i]),
+            'anomaly_reason': reasons[i]
+        }
+        for i in range(len(promo_scores))
+    ]
+
+PREDICTION_FIELDS = ['promotion_score', 'attrition_label', 'anomaly_score', 'anomaly_reason']
+
+def model_inputs(models, employee_doc):
+    """Returns the three model input matrices for a document and the fingerprint identifying them."""
+    inputs = models.feature_assembler.build(employee_doc)
+    return inputs, fingerprint_inputs(models.version, *inputs)
+
+def stored_predictions(employee_doc, fingerprint):
+    """
+    Returns the predictions materialized on the document, provided they were computed from its
+    current inputs by the currently loaded models. Anything else counts as stale.
+    """
+    record = employee_doc.get('predictions')
+    if isinstance(record, dict) and record.get('fingerprint') == fingerprint:
+        return {field: record.get(field) for field in PREDICTION_FIELDS}
+    return None
+
+def prediction_record(models, predictions, fingerprint):
+    """Shape of the 'predictions' sub-document persisted on employee records."""
+    return dict(predictions, fingerprint=fingerprint, model_version=models.version, scored_at=datetime.utcnow())
+
+def materialize_predictions(employee_doc):
+    """Scores a document at write time and returns the record to store under its 'predictions' field."""
+    with model_manager.pin() as models:
+        inputs, fingerprint = model_inputs(models, employee_doc)
+        predictions = run_models(models, *inputs)[0]
+        prediction_cache.set(employee_doc.get('employee_id'), fingerprint, predictions)
+        return prediction_record(models, predictions, fingerprint)
+
+def predict_employee(employee_doc, collection=None):
+    """
+    Returns the promotion, attrition and anomaly predictions for one employee document.
+    Lookup order is: predictions stored on the document, the prediction cache, then inference.
+    When a collection is given and the stored predictions were missing or stale (for example
+    after a model update), the fresh result is written back so the next read is a plain lookup.
+    """
+    with model_manager.pin() as models:
+        inputs, fingerprint = model_inputs(models, employee_doc)
+        predictions = stored_predictions(employee_doc, fingerprint)
+        if predictions is not None:
+            return predictions
+
+        employee_id = employee_doc.get('employee_id')
+        predictions = prediction_cache.get(employee_id, fingerprint)
+        if predictions is None:
+            predictions = run_models(models, *inputs)[0]
+            prediction_cache.set(employee_id, fingerprint, predictions)
+
+        if collection is not None and employee_id is not None:
+            collection.update_one({'employee_id': employee_id},
+                                  {'$set': {'predictions': prediction_record(models, predictions, fingerprint)}})
+        return predictions
+
+def predict_employees(employee_docs, collection=None):
+    """
+    Batch counterpart of predict_employee: stored and cached predictions are reused and
+    the remaining rows are scored together in one pass per model.
+    """
+    with model_manager.pin() as models:
+        promo_input, attrition_input, anomaly_input = models.feature_assembler.build_batch(employee_docs)
+
+        predictions = [None] * len(employee_docs)
+        fingerprints = []
+        refreshed = []
+        for i, doc in enumerate(employee_docs):
+            fingerprint = fingerprint_inputs(models.version, promo_input[i:i + 1], attrition_input[i:i + 1], anomaly_input[i:i + 1])
+            fingerprints.append(fingerprint)
+            predictions[i] = stored_predictions(doc, fingerprint)
+            if predictions[i] is None:
+                predictions[i] = prediction_cache.get(doc.get('employee_id'), fingerprint)
+                refreshed.append(i)
+
+        missing = [i for i, cached in enumerate(predictions) if cached is None]
+        if missing:
+            fresh = run_models(models, promo_input[missing], attrition_input[missing], anomaly_input[missing])
+            for i, result in zip(missing, fresh):
+                predictions[i] = result
+                prediction_cache.set(employee_docs[i].get('employee_id'), fingerprints[i], result)
+
+        if collection is not None:
+            write_backs = [
+                UpdateOne({'employee_id': employee_docs[i]['employee_id']},
+                          {'$set': {'predictions': prediction_record(models, predictions[i], fingerprints[i])}})
+                for i in refreshed if employee_docs[i].get('employee_id') is not None
+            ]
+            if write_backs:
+                collection.bulk_write(write_backs, ordered=False)
+        return predictions
+
+def evaluate_employees(employee_docs, collection=None):
+    """
+    Runs the promotion, attrition and anomaly models over a batch of employee documents,
+    calling each model once for the whole batch, and returns one formatted result per document.
+    """
+    if not employee_docs:
+        return []
+
+    all_predictions = predict_employees(employee_docs, collection)
+
+    results = []
+    for doc, predictions in zip(employee_docs, all_predictions):
+        name = doc.get('name')
+        promo_result = format_promotion_result(name, predictions['promotion_score'])
+        promo_result.update({
+            'employee_id': doc.get('employee_id'),
+            'department': doc.get('department'),
+            'role': doc.get('designation'),
+            'kpi_scores': build_kpi_scores(doc)
+        })
+        results.append({
+            'employee_id': doc.get('employee_id'),
+            'name': name,
+            'promotion': promo_result,
+            'attrition': format_attrition_result(name, predictions['attrition_label']),
+            'anomaly': format_anomaly_result(predictions['anomaly_score'], predictions['anomaly_reason'])
+        })
+    return results
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 # ✅ START: MODIFIED /upload ROUTE
+# Uploads are parsed straight off the request stream in UPLOAD_BATCH_ROWS-row chunks and written
+# with unordered insert_many batches; pass ?upload_id=<id> and poll /api/uploads/<id> for progress.
+UPLOAD_BATCH_ROWS = int(os.getenv('UPLOAD_BATCH_ROWS', 1000))
+upload_progress = UploadProgress()
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     print("✅ Flask /upload route was called")
 
-    if 'file' not in request.files:
+    # The body is read as a stream here; touching request.files would spool the whole upload first.
+    if request.mimetype == 'multipart/form-data':
+        boundary = request.mimetype_params.get('boundary')
+        if not boundary:
+            return "No file uploaded.", 400
+        source = MultipartFileStream(request.stream, boundary.encode('latin-1'))
+        filename = source.open_file()
+        if filename is None:
+            return "No file uploaded.", 400
+        if filename == '':
+            return "No selected file.", 400
+        if not filename.endswith('.csv'):
+            return "Invalid file type. Please upload a CSV file.", 400
+    elif request.mimetype == 'text/csv':
+        source = RawBodyStream(request.stream)
+    else:
         return "No file uploaded.", 400
 
-    file = request.files['file']
-    if file.filename == '':
-        return "No selected file.", 400
+    upload_id = upload_progress.start(request.args.get('upload_id'), request.content_length)
+    # Each upload stages into its own collection (named by a server-side id, not the client's
+    # upload_id), so concurrent uploads can't drop or interleave each other's rows.
+    incoming_collection = db[f"{staging_collection.name}_incoming_{uuid.uuid4().hex}"]
 
-    if file and file.filename.endswith('.csv'):
-        filename = secure_filename(file.filename)
-        input_path = os.path.join(UPLOAD_FOLDER, filename)
+    def on_batch(rows, batches):
+        upload_progress.update(upload_id, rows=rows, batches=batches, bytes_read=source.bytes_read)
+        if batches % 100 == 0:
+            print(f"ℹ️ Upload {upload_id}: {rows} rows staged so far")
 
-        try:
-            file.save(input_path)
-            raw_df = pd.read_csv(input_path)
-            raw_data_for_mongo = raw_df.replace({np.nan: None}).to_dict(orient='records')
+    try:
+        rows = ingest_csv(source, incoming_collection, UPLOAD_BATCH_ROWS, on_batch)
 
-            # 1. Clear the staging collection to ensure it only holds the latest upload
+        # Swap the new rows in at once, so the staging collection only ever holds a complete upload.
+        if rows:
+            incoming_collection.rename(staging_collection.name, dropTarget=True)
+            ensure_indexes(db)
+        else:
+            incoming_collection.drop()
             staging_collection.delete_many({})
-            print("✅ Staging collection cleared.")
+        print(f"✅ Inserted {rows} records into staging collection.")
 
-            # 2. Insert new data into the staging collection instead of the main one
-            if raw_data_for_mongo:
-                staging_collection.insert_many(raw_data_for_mongo)
-                print(f"✅ Inserted {len(raw_data_for_mongo)} records into staging collection.")
+    except Exception as e:
+        upload_progress.update(upload_id, state='failed', error=str(e), finished_at=time.time())
+        incoming_collection.drop()
+        import traceback
+        traceback.print_exc()
+        return f"❌ Error during file processing and staging: {str(e)}", 500
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return f"❌ Error during file processing and staging: {str(e)}", 500
+    upload_progress.update(upload_id, state='done', rows=rows, bytes_read=source.bytes_read, finished_at=time.time())
 
-        # The response signals success to the frontend
-        return jsonify({
-            "message": "Data uploaded and staged successfully for evaluation",
-            "redirect_url": "/search-employee" 
-        }), 200
+    # The response signals success to the frontend
+    return jsonify({
+        "message": "Data uploaded and staged successfully for evaluation",
+        "redirect_url": "/search-employee",
+        "upload_id": upload_id,
+        "rows": rows
+    }), 200
 
-    return "Invalid file type. Please upload a CSV file.", 400
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload_progress(upload_id):
+    progress = upload_progress.get(upload_id)
+    if progress is None:
+        return jsonify({'error': 'Unknown upload id'}), 404
+    return jsonify(progress), 200
 # ✅ END: MODIFIED /upload ROUTE
 
 
@@ -830,83 +1425,12 @@ def upload_file():
 # In app.py, replace the dashboard_data function with this final version.
 
 @app.route('/api/dashboard-data', methods=['GET'])
+@response_cache.cached('dashboard-data', ['employees', 'manager_users'], coalescer=request_coalescer)
 def dashboard_data():
     try:
-        # --- START OF MODIFICATION ---
-        
-        # 1. Get full documents for all managers from the 'manager_users' collection.
-        manager_docs = list(manager_users_collection.find({}, {'password': 0}))
-        
-        # 2. Get all personnel records from the 'employees' collection.
-        all_personnel = list(employees_collection.find({}))
-
-        # 3. Create a unified list.
-        # This step adds managers to the personnel list if they don't already have their own record.
-        employee_names = {person.get('name') for person in all_personnel}
-        
-        for manager in manager_docs:
-            manager_name = manager.get('name')
-            if manager_name not in employee_names:
-                # If the manager is not in the employees list, create a record for them.
-                all_personnel.append(manager)
-
-        # 4. Ensure all managers have the correct role, even if they already had a record.
-        manager_names_set = {manager.get('name') for manager in manager_docs}
-        for person in all_personnel:
-            if person.get('name') in manager_names_set:
-                person['role'] = 'Manager'
-
-        # --- END OF MODIFICATION ---
-
-        if not all_personnel:
-            return jsonify({
-                'total_personnel': 0, 'employee_total': 0, 'manager_total': 0,
-                'employee_completed': 0, 'employee_in_progress': 0,
-                'employee_list': [], 'manager_list': []
-            })
-
-        df = pd.DataFrame(all_personnel)
-        df = df.dropna(how='all')
-
-        # If the role column is still missing for some records, default it to Employee.
-        if 'role' not in df.columns:
-            df['role'] = 'Employee'
-        else:
-            df['role'] = df['role'].fillna('Employee')
-
-        total_personnel = len(df)
-        
-        employees_df = df[df['role'] != 'Manager']
-        
-        employee_total = len(employees_df)
-        employee_completed = employees_df['tenure_in_current_role'].notna().sum()
-        employee_in_progress = employee_total - employee_completed
-
-        employee_list = []
-        manager_list = []
-        
-        df['status'] = np.where(df['tenure_in_current_role'].isna(), 'In Progress', 'Completed')
-        
-        cols_for_list = ['name', 'reporting_manager', 'status', 'role']
-        all_users_for_list = df[cols_for_list].fillna('-').to_dict(orient='records')
-
-        for user in all_users_for_list:
-            if user.get('role') == 'Employee':
-                employee_list.append(user)
-            else :
-                manager_list.append(user)
-
-        manager_total = len(manager_list)
-
-        response = {
-            'total_personnel': int(total_personnel),
-            'employee_total': int(employee_total),
-            'manager_total': int(manager_total),
-            'employee_completed': int(employee_completed),
-            'employee_in_progress': int(employee_in_progress),
-            'employee_list': employee_list,
-            'manager_list': manager_list
-        }
+        # Counts and list rows come straight out of one aggregation over employees + manager_users,
+        # projected down to the four fields the dashboard shows.
+        response = dashboard_summary(employees_collection, manager_users_collection.name)
         return jsonify(response)
 
     except Exception as e:
@@ -918,40 +1442,43 @@ def dashboard_data():
 # --- REVISED: Endpoint to get all users for the EmployeeList/Manager Dashboard page ---
 
 @app.route('/api/employees/all', methods=['GET'])
+@response_cache.cached('employees/all', ['employees', 'manager_users'],
+                       bypass=lambda: bool(request.args.get('stream')) or request.args.get('fields', '').lower() == 'all')
 def get_all_personnel():
+    """
+    Keyset-paginated personnel list ordered by employee_id.
+    Query params: cursor (next_cursor from the previous page), limit (default 50, max 500),
+    fields (extra columns, comma separated, or 'all'), q (name contains, case-insensitive),
+    role ('manager' or 'employee'), stream=1 (NDJSON export of every matching row).
+    """
     try:
-        # 1. Fetch all managers and employees from their respective collections
-        manager_docs = list(manager_users_collection.find({}, {'password': 0, '_id': 0}))
-        employee_docs = list(employees_collection.find({}, {'_id': 0}))
-
-        # 2. Create a unified list of all personnel
-        unified_personnel = employee_docs
-        employee_names = {person.get('name') for person in unified_personnel}
-        
-        # Add managers who are not already in the employee list
-        for manager in manager_docs:
-            if manager.get('name') not in employee_names:
-                unified_personnel.append(manager)
+        fields = parse_fields(request.args.get('fields'))
+        q = request.args.get('q', '').strip() or None
+        role = request.args.get('role', '').strip().lower() or None
+        if role is not None and role not in ROLE_FILTERS:
+            return jsonify({'error': f"role must be one of: {', '.join(ROLE_FILTERS)}"}), 400
+
+        if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+            def generate():
+                for row in iter_personnel(employees_collection, fields, manager_collection_name=manager_users_collection.name,
+                                          q=q, role=role):
+                    yield json.dumps(row, default=str) + "\n"
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                            headers={'Content-Disposition': 'attachment; filename=personnel.ndjson'})
 
-        # 3. Ensure roles and status are correctly set for everyone
-        manager_names_set = {manager.get('name') for manager in manager_docs}
-        
-        for person in unified_personnel:
-            # Assign 'Manager' role to anyone found in the manager list
-            if person.get('name') in manager_names_set:
-                person['role'] = 'Manager'
-            # Default to 'Employee' if role is missing
-            elif 'role' not in person or not person['role']:
-                person['role'] = 'Employee'
-            
-            # Determine evaluation status based on a data field (like tenure)
-            person['status'] = 'Completed' if pd.notna(person.get('tenure_in_current_role')) else 'In Progress'
-            
-            # Provide a fallback for designation if it's missing
-            if 'designation' not in person or pd.isna(person.get('designation')):
-                person['designation'] = person.get('role', 'N/A')
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
 
-        return jsonify({'users': unified_personnel})
+        try:
+            users, next_cursor = fetch_personnel_page(employees_collection, request.args.get('cursor') or None, limit,
+                                                      fields, manager_users_collection.name, q, role)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'users': users, 'next_cursor': next_cursor, 'limit': limit})
 
     except Exception as e:
         print("❌ Error in /api/employees/all:", str(e))
@@ -990,48 +1517,14 @@ def search_employee():
         # --- END: NEW VALIDATION LOGIC ---
 
         # The rest of the prediction logic remains the same...
-        employee_data = pd.DataFrame([employee_data_dict])
         try:
-            # ... (all your prediction code here is fine) ...
-            promo_input_cols = [col for col in promotion_features if col in employee_data.columns]
-            attrition_input_cols = [col for col in attrition_features if col in employee_data.columns]
-            anomaly_input_cols = [col for col in anomaly_features if col in employee_data.columns]
-
-            promo_input = employee_data[promo_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-            attrition_input = employee_data[attrition_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-            anomaly_input = employee_data[anomaly_input_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-            for feature in promotion_features:
-                if feature not in promo_input.columns:
-                    promo_input[feature] = 0
-            for feature in attrition_features:
-                if feature not in attrition_input.columns:
-                    attrition_input[feature] = 0
-            for feature in anomaly_features:
-                if feature not in anomaly_input.columns:
-                    anomaly_input[feature] = 0
-
-            promo_input = promo_input[promotion_features]
-            attrition_input = attrition_input[attrition_features]
-            anomaly_input = anomaly_input[anomaly_features]
-
-            flags, scores, reasons = anomaly_model.predict_with_reason(anomaly_input)
-            promo_score = promotion_model.predict(promo_input)[0]
-            attr_class = attrition_model.predict(attrition_input)[0]
-            attr_label = label_encoder.inverse_transform([attr_class])[0]
-            anomaly_score = scores[0]
-            reason = reasons[0]
-            
-            feedback_text = "\n".join([
-                f"{col.replace('_', ' ').title()}: {employee_data_dict.get(col, '')}"
-                for col in ['manager_comments', 'hr_notes', 'peer_reviews', 'client_feedback']
-                if employee_data_dict.get(col) is not None and str(employee_data_dict.get(col)).strip() != ''
-            ])
-
-            if feedback_text.strip():
-                feedback_summary = summarize_feedback_gemini(feedback_text)
-            else:
-                feedback_summary = "No feedback provided for this employee."
+            predictions = predict_employee(employee_data_dict, staging_collection)
+            promo_score = predictions['promotion_score']
+            attr_label = predictions['attrition_label']
+            anomaly_score = predictions['anomaly_score']
+            reason = predictions['anomaly_reason']
+
+            feedback = start_feedback_summary(employee_data_dict, "No feedback provided for this employee.")
 
             promo_result = format_promotion_result(employee_name, promo_score)
             promo_result['employee_id'] = employee_data_dict.get('employee_id')
@@ -1052,7 +1545,7 @@ def search_employee():
                 'promotion': promo_result,
                 'attrition': format_attrition_result(employee_name, attr_label),
                 'anomaly': format_anomaly_result(anomaly_score, reason),
-                'feedback_summary': feedback_summary
+                **feedback
             }
 
             return jsonify(result_data), 200
@@ -1072,119 +1565,14 @@ def search_employee():
 # All subsequent code remains the same as in your original file.
 # ... (paste the rest of your app.py code from get_insights() onwards) ...
 @app.route('/api/insights')
+@response_cache.cached('insights', ['employees', 'insights_aggregates'], coalescer=request_coalescer)
 def get_insights():
-    import numpy as np
-    from flask import jsonify
-
     try:
-        # Load all data from MongoDB
-        all_employees_data = list(employees_collection.find({}))
-        if not all_employees_data:
+        if employees_collection.estimated_document_count() == 0:
             return jsonify({'error': 'No employee data found in MongoDB'}), 404
 
-        df = pd.DataFrame(all_employees_data)
-
-        # Ensure numeric columns are actually numeric, coercing errors
-        for col in ['overall_weighted_score', 'leadership_score', 'integrity_feedback_score',
-                    'collaboration_communication_score', 'adaptability_growth_score',
-                    'skill_development_score', 'effort_engagement_score']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        df = df.dropna(subset=['overall_weighted_score']) # Drop rows where overall_weighted_score couldn't be converted
-
-        # 1️⃣ Overall Org Score
-        overall_score = round(df['overall_weighted_score'].mean(), 2) if not df.empty else 0.0
-
-        # 2️⃣ Category-wise Breakdown
-        category_cols = [
-            'leadership_score',
-            'integrity_feedback_score',
-            'collaboration_communication_score',
-            'adaptability_growth_score',
-            'skill_development_score',
-            'effort_engagement_score'
-        ]
-        category_scores = []
-        for col in category_cols:
-            if col in df.columns and not df[col].dropna().empty: # Check if column exists and has non-NaN values
-                category_scores.append({
-                    'category': col.replace('_score', '').replace('_', ' ').title(),
-                    'score': round(df[col].mean(), 2)
-                })
-            else:
-                category_scores.append({
-                    'category': col.replace('_score', '').replace('_', ' ').title(),
-                    'score': 0.0 # Default if no data
-                })
-
-        # 3️⃣ Radar Skill Balance
-        radar_cols = [
-            'leadership_score',
-            'collaboration_communication_score',
-            'adaptability_growth_score',
-            'skill_development_score',
-            'effort_engagement_score'
-        ]
-        skill_balance = []
-        for col in radar_cols:
-            if col in df.columns and not df[col].dropna().empty:
-                skill_balance.append({
-                    'skill': col.replace('_score', '').replace('_', ' ').title(),
-                    'value': round(df[col].mean(), 2)
-                })
-            else:
-                skill_balance.append({
-                    'skill': col.replace('_score', '').replace('_', ' ').title(),
-                    'value': 0.0 # Default if no data
-                })
-
-        # 4️⃣ Monthly Trends (mocked if no dates in MongoDB)
-        trends = []
-        # If your MongoDB documents contain 'evaluation_month' or a similar date field
-        if 'evaluation_month' in df.columns and not df['evaluation_month'].dropna().empty:
-            grouped = df.groupby('evaluation_month')['overall_weighted_score'].mean()
-            trends = [{'month': month, 'avg_score': round(score, 2)} for month, score in grouped.items()]
-        else:
-            # Simulated months for demo/testing if no actual date data
-            trends = [
-                {'month': 'Jan', 'avg_score': 3.2},
-                {'month': 'Feb', 'avg_score': 3.5},
-                {'month': 'Mar', 'avg_score': 3.7},
-                {'month': 'Apr', 'avg_score': 3.9},
-                {'month': 'May', 'avg_score': 4.0},
-            ]
-
-        # 5️⃣ Team-wise Heatmap Data
-        heatmap = []
-        if 'department' in df.columns and not df['department'].dropna().empty:
-            # Filter radar_cols to only those present in the DataFrame
-            actual_radar_cols = [col for col in radar_cols if col in df.columns]
-
-            if not df['department'].empty and not actual_radar_cols:
-                # Handle case where department column exists but no relevant radar_cols
-                heatmap = [] # Or default heatmap data if needed
-            elif not df['department'].empty and actual_radar_cols:
-                grouped = df.groupby('department')[actual_radar_cols].mean().round(2)
-                for dept, row in grouped.iterrows():
-                    entry = {'team': dept}
-                    for col, val in row.items():
-                        label = col.replace('_score', '').replace('_', ' ').title()
-                        entry[label] = val
-                    heatmap.append(entry)
-            else:
-                heatmap = [] # Default if 'department' column is missing or empty
-        else:
-            heatmap = [] # Default if 'department' column is missing or empty
-
-
-        return jsonify({
-            'overall_score': overall_score,
-            'category_scores': category_scores,
-            'skill_balance': skill_balance,
-            'monthly_trends': trends,
-            'team_heatmap': heatmap
-        })
+        # Served from the materialized per-department aggregates (see insights_store.py).
+        return jsonify(insights_store.insights())
 
     except Exception as e:
         print("❌ Error in /api/insights:", str(e))
@@ -1283,7 +1671,7 @@ def manual_entry_hr():
         if user_collection.find_one({'email': data['email']}):
             return jsonify({'error': f'A user with this email already exists as a {role.lower()}.'}), 409
 
-        hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        hashed_password = credentials_directory.hash_password(data['password'])
         user_doc = {
             "employee_id": data['employee_id'],
             "name": data['name'],
@@ -1291,7 +1679,13 @@ def manual_entry_hr():
             "password": hashed_password,
             "role": role
         }
-        user_collection.insert_one(user_doc)
+        try:
+            user_collection.insert_one(user_doc)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent request for the same ID or email.
+            return jsonify({'error': f'A {role.lower()} with this ID or email already exists.'}), 409
+        response_cache.bump(user_collection_name)
+        credentials_directory.sync_user(user_collection_name, user_doc)
         print(f"✅ {role} account created for {data['employee_id']} in '{user_collection_name}'")
 
         # --- HR Record Creation in 'employees' collection ---
@@ -1299,11 +1693,14 @@ def manual_entry_hr():
         if 'password' in hr_document:
             del hr_document['password']
         
-        employees_collection.update_one(
-            {'employee_id': data['employee_id']},
-            {'$set': hr_document},
-            upsert=True
-        )
+        with insights_store.tracking({'employee_id': data['employee_id']}):
+            employees_collection.update_one(
+                {'employee_id': data['employee_id']},
+                {'$set': hr_document},
+                upsert=True
+            )
+        response_cache.bump('employees')
+        invalidate_employee_caches(data['employee_id'])
         print(f"✅ HR entry for {data['employee_id']} ({role}) saved/updated in 'employees'")
 
         # --- START: NEW FEATURE - Update Manager's Team List ---
@@ -1324,6 +1721,7 @@ def manual_entry_hr():
                 {'name': manager_name},
                 {'$addToSet': {'team_members': new_employee_info}}
             )
+            response_cache.bump('manager_users')
 
             if update_result.matched_count > 0:
                 if update_result.modified_count > 0:
@@ -1431,14 +1829,17 @@ def update_employee_by_id(emp_id):
         # --- END OF FIX ---
 
         # Use the cleaned 'update_payload' for the database operation.
-        result = employees_collection.update_one(
-            {'employee_id': emp_id},
-            {'$set': update_payload}
-        )
+        with insights_store.tracking({'employee_id': emp_id}):
+            result = employees_collection.update_one(
+                {'employee_id': emp_id},
+                {'$set': update_payload}
+            )
+        response_cache.bump('employees')
 
         if result.matched_count == 0:
             return jsonify({'error': 'Employee not found'}), 404
 
+        invalidate_employee_caches(emp_id)
         return jsonify({'message': 'Employee record updated successfully!'}), 200
 
     except Exception as e:
@@ -1472,11 +1873,15 @@ def delete_employee(emp_id):
         reporting_manager_name = employee_to_delete.get('reporting_manager')
 
         # 3. Delete the main employee data from the 'employees' collection.
-        employees_collection.delete_one({'employee_id': emp_id})
+        with insights_store.tracking({'employee_id': emp_id}):
+            employees_collection.delete_one({'employee_id': emp_id})
+        response_cache.bump('employees')
+        invalidate_employee_caches(emp_id)
         print(f"✅ Deleted employee '{emp_id}' from 'employees' collection.")
 
         # 4. Delete the user login record from the 'employee_users' collection.
         db.employee_users.delete_one({'employee_id': emp_id})
+        credentials_directory.remove_user('employee_users', emp_id)
         print(f"✅ Deleted user account for '{emp_id}' from 'employee_users' collection.")
 
         # 5. If they reported to a manager, remove them from that manager's team list.
@@ -1485,6 +1890,7 @@ def delete_employee(emp_id):
                 {'name': reporting_manager_name},
                 {'$pull': {'team_members': {'employee_id': emp_id}}}
             )
+            response_cache.bump('manager_users')
             print(f"✅ Removed '{emp_id}' from manager '{reporting_manager_name}'s team list.")
 
         return jsonify({'message': f"Employee '{emp_id}' has been permanently deleted."}), 200
@@ -1536,6 +1942,7 @@ def get_employee_by_id():
 
 
 @app.route('/manual-entry/employees', methods=['GET'])
+@response_cache.cached('manual-entry/employees', ['employees', 'manager_users'])
 def get_all_employees_from_hr_file():
     try:
         # Use a dictionary to store unique personnel by employee_id to avoid duplicates
@@ -1606,11 +2013,20 @@ def save_manual_tl_data():
         # Clean NaN values before saving to MongoDB
         cleaned_doc = {k: (None if pd.isna(v) else v) for k, v in emp_document_with_kpis.items()}
 
+        # Score the evaluation now so later reads are plain lookups
+        invalidate_employee_caches(employee_id)
+        try:
+            cleaned_doc['predictions'] = materialize_predictions(cleaned_doc)
+        except Exception as e:
+            print(f"⚠️ Could not score {employee_id} at save time, it will be scored on first read: {e}")
+
         # Update the document in MongoDB
-        employees_collection.update_one(
-            {'employee_id': employee_id},
-            {'$set': cleaned_doc}
-        )
+        with insights_store.tracking({'employee_id': employee_id}):
+            employees_collection.update_one(
+                {'employee_id': employee_id},
+                {'$set': cleaned_doc}
+            )
+        response_cache.bump('employees')
 
         print(f'✅ TL evaluation completed and saved for {employee_id}')
         return jsonify({'message': '✅ Evaluation completed and saved'}), 200
@@ -1649,11 +2065,20 @@ def update_tl_entry(emp_id):
         # NaN is not a valid BSON/JSON type and should be stored as null (None in Python).
         cleaned_doc = {k: (None if pd.isna(v) else v) for k, v in updated_doc_with_kpis.items()}
 
+        # Score the evaluation now so later reads are plain lookups
+        invalidate_employee_caches(emp_id)
+        try:
+            cleaned_doc['predictions'] = materialize_predictions(cleaned_doc)
+        except Exception as e:
+            print(f"⚠️ Could not score {emp_id} at save time, it will be scored on first read: {e}")
+
         # Save updated document back to MongoDB
-        result = employees_collection.update_one(
-            {'employee_id': emp_id},
-            {'$set': cleaned_doc}
-        )
+        with insights_store.tracking({'employee_id': emp_id}):
+            result = employees_collection.update_one(
+                {'employee_id': emp_id},
+                {'$set': cleaned_doc}
+            )
+        response_cache.bump('employees')
 
         if result.matched_count == 0:
             return jsonify({'error': f'Employee ID {emp_id} not found for update'}), 404
@@ -0,0 +1,113 @@
+import re
+
+BATCH_PROMPT_HEADER = """
+    For each employee below, summarize their feedback and provide:
+    1. Sentiment (Positive, Neutral, Negative)
+    2. Key themes (e.g., leadership, punctuality, communication)
+    3. One-line summary
+    4. Soft-skills score between -1.0 and +1.0
+
+    Answer every employee, in the same order, using exactly this layout and nothing else:
+    ### <employee key>
+    Sentiment: ...
+    Key themes: ...
+    One-line summary: ...
+    Soft-skills score: ...
+    """
+
+SECTION_HEADER = re.compile(r'^\s*#{2,}\s*(E\d+)\s*$', re.MULTILINE)
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text; good enough for packing.
+    return len(text) // 4 + 1
+
+
+def pack_batches(items, token_budget, max_items):
+    """
+    Greedily groups (key, text) pairs so that each group's prompt stays under `token_budget`
+    tokens and holds at most `max_items` entries. An entry bigger than the budget goes alone.
+    """
+    overhead = estimate_tokens(BATCH_PROMPT_HEADER)
+    batches, current, used = [], [], overhead
+    for key, text in items:
+        cost = estimate_tokens(text) + 8
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], overhead
+        current.append((key, text))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(entries):
+    """`entries` is a list of (alias, text); aliases are short E<n> labels the model echoes back."""
+    body = "\n\n".join(f"### {alias}\nFeedback: \"{text}\"" for alias, text in entries)
+    return f"{BATCH_PROMPT_HEADER}\n{body}\n"
+
+
+def parse_batch_response(text, aliases):
+    """
+    Splits a batch response into {alias: summary}. Sections for unknown aliases, duplicate
+    sections and sections without a sentiment line are dropped, so their entries fall back
+    to a single call.
+    """
+    parsed, rejected = {}, set()
+    matches = list(SECTION_HEADER.finditer(text))
+    for i, match in enumerate(matches):
+        alias = match.group(1)
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        summary = text[match.end():end].strip()
+        if alias in parsed or alias not in aliases or 'sentiment' not in summary.lower():
+            rejected.add(alias)
+            continue
+        parsed[alias] = summary
+    return {alias: summary for alias, summary in parsed.items() if alias not in rejected}
+
+
+class BatchSummarizer:
+    """
+    Summarizes many feedback texts with few LLM calls by packing several employees into one
+    structured prompt. Entries whose section is missing or malformed in the reply, and whole
+    batches whose call fails, are retried one by one through `summarize_one`.
+    """
+
+    def __init__(self, generate, summarize_one, token_budget=6000, max_items=20):
+        self.generate = generate
+        self.summarize_one = summarize_one
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.batch_calls = 0
+        self.fallback_calls = 0
+
+    def summarize_many(self, texts):
+        """`texts` maps any key to its feedback text; returns the same keys mapped to summaries."""
+        results = {}
+        for batch in pack_batches(list(texts.items()), self.token_budget, self.max_items):
+            if len(batch) == 1:
+                key, text = batch[0]
+                results[key] = self.summarize_one(text)
+                self.fallback_calls += 1
+                continue
+
+            aliases = {f"E{i + 1}": key for i, (key, _) in enumerate(batch)}
+            parsed = {}
+            try:
+                self.batch_calls += 1
+                response = self.generate(build_batch_prompt([(alias, texts[key]) for alias, key in aliases.items()]))
+                parsed = parse_batch_response(response, aliases)
+            except Exception as e:
+                print(f"⚠️ Batch summary call failed, falling back to single calls: {e}")
+
+            for alias, key in aliases.items():
+                if alias in parsed:
+                    results[key] = parsed[alias]
+                else:
+                    results[key] = self.summarize_one(texts[key])
+                    self.fallback_calls += 1
+        return results
+
+    def stats(self):
+        return {'batch_calls': self.batch_calls, 'fallback_calls': self.fallback_calls}
@@ -0,0 +1,75 @@
+import os
+import random
+import re
+import time
+
+import pandas as pd
+
+from batch_summarizer import BatchSummarizer, estimate_tokens
+
+FEEDBACK_COLUMNS = ['manager_comments', 'hr_notes', 'peer_reviews', 'client_feedback']
+
+
+class FakeLLM:
+    """
+    Stand-in for Gemini: each call costs a fixed round trip plus time per token, and answers in
+    the requested layout. `garble_rate` drops that share of sections to exercise the fallback.
+    """
+
+    def __init__(self, round_trip_ms=400, ms_per_token=0.05, garble_rate=0.0, seed=0):
+        self.round_trip_ms = round_trip_ms
+        self.ms_per_token = ms_per_token
+        self.garble_rate = garble_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def _answer(self):
+        return ("Sentiment: Positive\nKey themes: communication, ownership\n"
+                "One-line summary: Reliable contributor.\nSoft-skills score: 0.6")
+
+    def generate(self, prompt):
+        self.calls += 1
+        time.sleep((self.round_trip_ms + self.ms_per_token * estimate_tokens(prompt)) / 1000)
+        aliases = re.findall(r'^### (E\d+)$', prompt, flags=re.MULTILINE)
+        if not aliases:
+            return self._answer()
+        return "\n".join(f"### {alias}\n{self._answer()}" for alias in aliases
+                         if self.random.random() >= self.garble_rate)
+
+
+def feedback_texts(n):
+    df = pd.read_csv('demo.csv') if os.path.exists('demo.csv') else pd.DataFrame()
+    texts = []
+    for _, row in df.iterrows():
+        text = "\n".join(f"{col.replace('_', ' ').title()}: {row[col]}"
+                         for col in FEEDBACK_COLUMNS if col in row and pd.notna(row[col]))
+        if text:
+            texts.append(text)
+    if not texts:
+        texts = ["Manager Comments: Consistently delivers on time and mentors juniors."]
+    return {f"EMP{i:05d}": texts[i % len(texts)] + f" (review {i})" for i in range(n)}
+
+
+def run(label, texts, llm, token_budget, max_items):
+    single = lambda text: llm.generate(f'Feedback: "{text}"')
+    summarizer = BatchSummarizer(llm.generate, single, token_budget=token_budget, max_items=max_items)
+    start = time.perf_counter()
+    if max_items == 1:
+        results = {key: single(text) for key, text in texts.items()}
+    else:
+        results = summarizer.summarize_many(texts)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(texts)
+    print(f"{label:<28} {len(texts):>5} summaries | {llm.calls:>4} LLM calls | "
+          f"{elapsed:6.2f} s | {len(texts) / elapsed:7.1f} summaries/s | fallbacks {summarizer.fallback_calls}")
+
+
+def main():
+    texts = feedback_texts(int(os.getenv('BENCH_SUMMARIES', 200)))
+    run("one call per employee", texts, FakeLLM(round_trip_ms=40), 6000, 1)
+    run("batched (6000 tokens)", texts, FakeLLM(round_trip_ms=40), 6000, 20)
+    run("batched, 10% garbled", texts, FakeLLM(round_trip_ms=40, garble_rate=0.1), 6000, 20)
+
+
+if __name__ == '__main__':
+    main()
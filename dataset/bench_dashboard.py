@@ -0,0 +1,112 @@
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from dashboard_pipeline import dashboard_summary
+from db_indexes import ensure_indexes
+
+# Runs against a real MongoDB (MONGO_URI, 5.0+) in a scratch database that is dropped afterwards.
+BENCH_DB = os.getenv('BENCH_DB', 'hr_data_dashboard_bench')
+SIZES = [int(n) for n in os.getenv('BENCH_PERSONNEL', '10000,100000').split(',')]
+MANAGER_SHARE = 50  # one manager account per this many employees
+
+
+def legacy_dashboard_summary(db):
+    """The pre-aggregation /api/dashboard-data implementation, kept here for comparison."""
+    manager_docs = list(db.manager_users.find({}, {'password': 0}))
+    all_personnel = list(db.employees.find({}))
+    employee_names = {person.get('name') for person in all_personnel}
+    for manager in manager_docs:
+        if manager.get('name') not in employee_names:
+            all_personnel.append(manager)
+    manager_names_set = {manager.get('name') for manager in manager_docs}
+    for person in all_personnel:
+        if person.get('name') in manager_names_set:
+            person['role'] = 'Manager'
+
+    df = pd.DataFrame(all_personnel).dropna(how='all')
+    df['role'] = df['role'].fillna('Employee') if 'role' in df.columns else 'Employee'
+    employees_df = df[df['role'] != 'Manager']
+    employee_total = len(employees_df)
+    employee_completed = employees_df['tenure_in_current_role'].notna().sum()
+    df['status'] = np.where(df['tenure_in_current_role'].isna(), 'In Progress', 'Completed')
+    rows = df[['name', 'reporting_manager', 'status', 'role']].fillna('-').to_dict(orient='records')
+    employee_list = [row for row in rows if row.get('role') == 'Employee']
+    manager_list = [row for row in rows if row.get('role') != 'Employee']
+    return {
+        'total_personnel': int(len(df)),
+        'employee_total': int(employee_total),
+        'manager_total': len(manager_list),
+        'employee_completed': int(employee_completed),
+        'employee_in_progress': int(employee_total - employee_completed),
+        'employee_list': employee_list,
+        'manager_list': manager_list,
+    }
+
+
+def seed(db, n_personnel):
+    """Fills employees with full-width rows cycled from demo.csv and adds manager accounts."""
+    template = pd.read_csv('demo.csv').to_dict(orient='records')
+    n_managers = max(1, n_personnel // MANAGER_SHARE)
+    manager_names = [f"Manager {i:05d}" for i in range(n_managers)]
+    db.employees.drop()
+    db.manager_users.drop()
+    ensure_indexes(db)
+
+    batch = []
+    for i in range(n_personnel):
+        doc = dict(template[i % len(template)])
+        doc['employee_id'] = f"EMP{i:06d}"
+        # Every other manager also has an employee record under the same name.
+        is_manager_record = i % (2 * MANAGER_SHARE) == 0
+        doc['name'] = manager_names[i // (2 * MANAGER_SHARE)] if is_manager_record else f"Employee {i:06d}"
+        doc['reporting_manager'] = manager_names[i % n_managers]
+        if i % 7 == 0:
+            doc['tenure_in_current_role'] = None  # still in progress
+        if i % 3 == 0:
+            doc['role'] = 'Employee'
+        batch.append(doc)
+        if len(batch) == 5000:
+            db.employees.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.employees.insert_many(batch, ordered=False)
+
+    managers = [{'name': name, 'email': f"manager{i}@example.com", 'password': 'x' * 60, 'role': 'Manager',
+                 'employee_id': f"MGR{i:05d}", 'team_members': []} for i, name in enumerate(manager_names)]
+    db.manager_users.insert_many(managers)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    load_dotenv()
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
+    db = client[BENCH_DB]
+    try:
+        for n in SIZES:
+            seed(db, n)
+            legacy, legacy_s, legacy_mb = measure(lambda: legacy_dashboard_summary(db))
+            pipeline, pipeline_s, pipeline_mb = measure(lambda: dashboard_summary(db.employees, 'manager_users'))
+            assert legacy == pipeline, "aggregation result differs from the legacy implementation"
+            print(f"{n:>7} personnel | legacy {legacy_s:6.2f} s {legacy_mb:7.1f} MB | "
+                  f"aggregation {pipeline_s:6.2f} s {pipeline_mb:7.1f} MB | {legacy_s / pipeline_s:5.1f}x faster")
+    finally:
+        client.drop_database(BENCH_DB)
+
+
+if __name__ == '__main__':
+    main()
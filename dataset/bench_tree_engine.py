@@ -0,0 +1,85 @@
+import os
+import time
+import joblib
+import numpy as np
+
+from anomaly import AnomalyDetectorWithReason
+from model_registry import legacy_class_aliases
+from tree_engine import compile_model
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+# name -> (model pickle, feature list pickle or None to use the model's n_features_in_)
+MODELS = {
+    'promotion_model': ('promotion_model.pkl', 'trained_features.pkl'),
+    'attrition_model': ('attrition_model.pkl', 'trained_features_attr.pkl'),
+    'anomaly_forest': ('anomaly_detector_with_reason.pkl', None),
+}
+
+
+def model_path(filename):
+    return os.path.join(MODELS_DIR, filename)
+
+
+def load_model(name):
+    """Returns (tree ensemble, n_features) for an entry of MODELS; unwraps the anomaly detector."""
+    model_file, features_file = MODELS[name]
+    with legacy_class_aliases():
+        model = joblib.load(model_path(model_file))
+    if isinstance(model, AnomalyDetectorWithReason):
+        model = model.model
+    n_features = len(joblib.load(model_path(features_file))) if features_file else model.n_features_in_
+    return model, n_features
+
+
+def sample_inputs(n_rows, n_features, seed=0):
+    # KPI-like values (mostly 0-5 with some larger counts) plus a sprinkle of zeros for absent fields.
+    rng = np.random.RandomState(seed)
+    X = rng.uniform(0, 5, size=(n_rows, n_features)) * rng.choice([1, 1, 1, 20], size=(n_rows, n_features))
+    X[rng.rand(n_rows, n_features) < 0.1] = 0
+    return X.astype(np.float32)
+
+
+def time_call(fn, X, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def check_parity(name, model, compiled, X):
+    if hasattr(model, 'decision_function'):
+        expected, actual = model.decision_function(X), compiled.decision_function(X)
+        assert np.allclose(expected, actual, atol=1e-9), f"{name}: decision_function mismatch"
+    if hasattr(model, 'predict_proba'):
+        expected, actual = model.predict_proba(X), compiled.predict_proba(X)
+        assert np.allclose(expected, actual, atol=1e-5), f"{name}: predict_proba mismatch"
+    expected, actual = model.predict(X), compiled.predict(X)
+    assert np.allclose(np.asarray(expected, dtype=np.float64), np.asarray(actual, dtype=np.float64), atol=1e-4), \
+        f"{name}: predict mismatch"
+
+
+def main():
+    for name, (model_file, _) in MODELS.items():
+        if not os.path.exists(model_path(model_file)):
+            print(f"⚠️ Skipping {name}: {model_path(model_file)} not found")
+            continue
+        model, n_features = load_model(name)
+
+        compiled = compile_model(model)
+        X = sample_inputs(10_000, n_features)
+        check_parity(name, model, compiled, X)
+        print(f"✅ {name}: compiled output matches the pickle on {len(X)} rows")
+
+        predict = model.decision_function if hasattr(model, 'decision_function') else model.predict
+        compiled_predict = compiled.decision_function if hasattr(model, 'decision_function') else compiled.predict
+        for rows, repeat in [(1, 200), (10_000, 5)]:
+            original_ms = time_call(predict, X[:rows], repeat)
+            compiled_ms = time_call(compiled_predict, X[:rows], repeat)
+            print(f"   {rows:>6} rows: pickle {original_ms:8.2f} ms | compiled {compiled_ms:8.2f} ms "
+                  f"| {original_ms / compiled_ms:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import threading
+from cachetools import TTLCache
+
+
+class ChatContextCache:
+    """
+    Short-lived per-employee cache of the chatbot's rendered performance context, so follow-up
+    chat messages skip the employee lookup, prediction and formatting work. Write routes call
+    invalidate() when an employee document changes; the TTL bounds staleness for writes made
+    through another worker.
+    """
+
+    def __init__(self, ttl_seconds=300, maxsize=1024):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, employee_id):
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def set(self, employee_id, entry):
+        with self._lock:
+            self._entries[employee_id] = entry
+
+    def invalidate(self, employee_id):
+        with self._lock:
+            self._entries.pop(employee_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
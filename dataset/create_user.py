@@ -4,6 +4,8 @@ from pymongo import MongoClient
 from flask_bcrypt import Bcrypt
 import os
 from dotenv import load_dotenv
+from credentials import CredentialsDirectory
+from response_cache import bump_versions
 
 def create_user_in_db(email, password, name, role, employee_id):
     """Adds a new user to a role-specific collection."""
@@ -45,6 +47,10 @@ def create_user_in_db(email, password, name, role, employee_id):
     }
     
     collection.insert_one(user_document)
+    # Keep the login directory used by /api/auth/login in sync.
+    CredentialsDirectory(db, bcrypt).sync_user(collection_name, user_document)
+    # Let the app's cached manager lists pick the new account up.
+    bump_versions(db, collection_name)
     print(f"✅ User '{name}' created successfully in collection: '{collection_name}'")
     client.close()
 
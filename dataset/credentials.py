@@ -0,0 +1,121 @@
+import os
+import sys
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+# Role collections in login priority order: an email present in several collections logs in with
+# the first (highest-privilege) one, exactly as the old per-collection scan did.
+ROLE_COLLECTIONS = [
+    ('hr_users', 'HR'),
+    ('manager_users', 'Manager'),
+    ('employee_users', 'Employee'),
+]
+ROLE_PRIORITY = {collection_name: i for i, (collection_name, _) in enumerate(ROLE_COLLECTIONS)}
+
+CREDENTIALS_COLLECTION = 'credentials'
+
+
+class CredentialsDirectory:
+    """
+    One document per login email in the 'credentials' collection (unique index on email), holding
+    the password hash, role and employee id. login resolves user and role with a single indexed
+    lookup instead of scanning hr_users, manager_users and employee_users in turn.
+
+    The role collections stay the source of truth: every write to them (manual_entry_hr,
+    delete_employee, create_user.py) calls sync_user() or remove_user(), and backfill() rebuilds
+    the directory from them (`python credentials.py backfill`). Accounts missing from the directory
+    are found on login and synced; other edits made to a role collection outside the app need a backfill.
+    """
+
+    def __init__(self, db, bcrypt=None):
+        self.db = db
+        self.collection = db[CREDENTIALS_COLLECTION]
+        self.bcrypt = bcrypt
+        try:
+            self.collection.create_index([('email', ASCENDING)], name='email_1', unique=True)
+            self.collection.create_index([('employee_id', ASCENDING)], name='employee_id_1')
+        except Exception as e:
+            print(f"⚠️ Could not create credentials indexes: {e}")
+
+    def find(self, email):
+        return self.collection.find_one({'email': email})
+
+    def sync_user(self, collection_name, user_doc):
+        """Copies a role-collection user into the directory unless a higher-priority role owns the email."""
+        email = user_doc.get('email')
+        if not email or collection_name not in ROLE_PRIORITY:
+            return
+        existing = self.find(email)
+        if existing and ROLE_PRIORITY.get(existing['user_collection'], 99) < ROLE_PRIORITY[collection_name]:
+            return
+        role = dict(ROLE_COLLECTIONS)[collection_name]
+        update = {'$set': {
+            'email': email,
+            'password': user_doc.get('password'),
+            'role': role,
+            'employee_id': user_doc.get('employee_id'),
+            'name': user_doc.get('name'),
+            'user_collection': collection_name,
+            'user_id': user_doc.get('_id'),
+        }}
+        try:
+            self.collection.update_one({'email': email}, update, upsert=True)
+        except DuplicateKeyError:
+            # Another request inserted this email first; the retry updates its document instead.
+            self.collection.update_one({'email': email}, update, upsert=True)
+
+    def remove_user(self, collection_name, employee_id):
+        """Drops directory entries for a deleted user, falling back to any lower-priority account."""
+        for entry in list(self.collection.find({'user_collection': collection_name, 'employee_id': employee_id})):
+            self.collection.delete_one({'_id': entry['_id']})
+            for other_collection, _ in ROLE_COLLECTIONS:
+                other = self.db[other_collection].find_one({'email': entry['email']})
+                if other:
+                    self.sync_user(other_collection, other)
+                    break
+
+    def backfill(self):
+        """Rebuilds the directory from the role collections (lowest priority first, so higher ones win)."""
+        synced = 0
+        for collection_name, _ in reversed(ROLE_COLLECTIONS):
+            for user_doc in self.db[collection_name].find({}, {'email': 1, 'password': 1, 'employee_id': 1, 'name': 1}):
+                self.sync_user(collection_name, user_doc)
+                synced += 1
+        return synced
+
+    def resolve(self, email):
+        """The login entry for `email`: one indexed lookup, falling back to the role collections on a miss."""
+        return self.find(email) or self.resolve_legacy(email)
+
+    def resolve_legacy(self, email):
+        """Old login path for accounts written straight into a role collection; syncs what it finds."""
+        for collection_name, _ in ROLE_COLLECTIONS:
+            user_doc = self.db[collection_name].find_one({'email': email})
+            if user_doc:
+                self.sync_user(collection_name, user_doc)
+                return self.find(email)
+        return None
+
+    # bcrypt runs inline on the request thread; it releases the GIL, so concurrent logins on a
+    # threaded worker hash in parallel rather than queueing behind each other.
+    def check_password(self, password_hash, password):
+        return self.bcrypt.check_password_hash(password_hash, password)
+
+    def hash_password(self, password):
+        return self.bcrypt.generate_password_hash(password).decode('utf-8')
+
+
+if __name__ == '__main__':
+    # Usage: python credentials.py backfill
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    database = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))['hr_data']
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill':
+        print(f"✅ Credentials directory built from {CredentialsDirectory(database).backfill()} user accounts")
+    else:
+        print("Usage: python credentials.py backfill")
+        sys.exit(2)
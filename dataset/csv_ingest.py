@@ -0,0 +1,135 @@
+import io
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+READ_CHUNK_BYTES = 64 * 1024
+DEFAULT_BATCH_ROWS = 1000
+
+
+class MultipartFileStream(io.RawIOBase):
+    """
+    Read-only file object over one file part of a multipart/form-data request body, decoded
+    straight from the request stream. Only the bytes of the current read chunk are held, so
+    nothing is spooled to memory or a temp file the way request.files would.
+    """
+
+    def __init__(self, stream, boundary, field_name='file', chunk_size=READ_CHUNK_BYTES):
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary)
+        self._field_name = field_name
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._in_file = False
+        self._file_done = False
+        self._eof = False
+        self.filename = None
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def _pump(self):
+        chunk = self._stream.read(self._chunk_size)
+        self.bytes_read += len(chunk)
+        self._decoder.receive_data(chunk or None)
+        event = self._decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, File) and event.name == self._field_name and self.filename is None:
+                self.filename = event.filename
+                self._in_file = True
+            elif isinstance(event, (File, Field)):
+                self._in_file = False
+            elif isinstance(event, Data) and self._in_file:
+                self._buffer += event.data
+                if not event.more_data:
+                    self._in_file = False
+                    self._file_done = True
+            event = self._decoder.next_event()
+        if isinstance(event, Epilogue) or not chunk:
+            self._eof = True
+
+    def open_file(self):
+        """Reads up to the start of the file part and returns its filename (None if there is none)."""
+        while self.filename is None and not self._eof:
+            self._pump()
+        return self.filename
+
+    def readinto(self, buffer):
+        while not self._buffer and not (self._file_done or self._eof):
+            self._pump()
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        del self._buffer[:size]
+        return size
+
+
+class RawBodyStream(io.RawIOBase):
+    """File object over a raw (text/csv) request body that counts the bytes read."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        self.bytes_read += len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class UploadProgress:
+    """Recent uploads by id, so a client can poll how far its ingestion has got."""
+
+    def __init__(self, maxsize=100):
+        self._uploads = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def start(self, upload_id=None, bytes_total=None):
+        upload_id = upload_id or uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {'upload_id': upload_id, 'state': 'receiving', 'rows': 0, 'batches': 0,
+                                        'bytes_read': 0, 'bytes_total': bytes_total, 'percent': None,
+                                        'started_at': time.time(), 'finished_at': None, 'error': None}
+        return upload_id
+
+    def update(self, upload_id, **fields):
+        with self._lock:
+            entry = self._uploads.get(upload_id)
+            if entry is None:
+                return
+            entry.update(fields)
+            if entry['bytes_total']:
+                entry['percent'] = round(min(100.0, 100.0 * entry['bytes_read'] / entry['bytes_total']), 1)
+
+    def get(self, upload_id):
+        with self._lock:
+            entry = self._uploads.get(upload_id)
+            return dict(entry) if entry else None
+
+
+def ingest_csv(fileobj, collection, batch_rows=DEFAULT_BATCH_ROWS, on_batch=None):
+    """
+    Parses CSV from `fileobj` in chunks of `batch_rows` rows, coercing types chunk by chunk the
+    way read_csv does (NaN -> None), and writes each chunk with one unordered insert_many.
+    Calls on_batch(rows_so_far, batches_so_far) after every batch. Returns the row count.
+    """
+    rows = batches = 0
+    reader = pd.read_csv(io.BufferedReader(fileobj, buffer_size=READ_CHUNK_BYTES), chunksize=batch_rows)
+    for chunk in reader:
+        records = chunk.replace({np.nan: None}).to_dict(orient='records')
+        if records:
+            collection.insert_many(records, ordered=False)
+        rows += len(records)
+        batches += 1
+        if on_batch:
+            on_batch(rows, batches)
+    return rows
@@ -0,0 +1,87 @@
+import math
+
+# Only these fields of an employee/manager document are read; everything else stays in the database.
+LIST_FIELDS = ['name', 'reporting_manager', 'role', 'tenure_in_current_role']
+
+
+def is_missing(expression):
+    """True for absent, null or NaN values (what pandas treated as NA in the old implementation)."""
+    return {'$in': [{'$ifNull': [expression, None]}, [None, math.nan]]}
+
+
+def or_dash(expression):
+    return {'$cond': [is_missing(expression), '-', expression]}
+
+
+def name_lookup(collection_name, as_field):
+    # Indexed on <collection>.name (see db_indexes.INDEX_SPECS); one _id is enough to know a match exists.
+    return {'$lookup': {
+        'from': collection_name,
+        'localField': 'name',
+        'foreignField': 'name',
+        'pipeline': [{'$limit': 1}, {'$project': {'_id': 1}}],
+        'as': as_field,
+    }}
+
+
+def dashboard_pipeline(manager_collection_name='manager_users', employee_collection_name='employees'):
+    """
+    Aggregation run on the employees collection that yields one dashboard row per person:
+    every employee (role forced to 'Manager' when a manager account has the same name), followed
+    by managers that have no employee record. Requires MongoDB 5.0+ ($lookup with localField and
+    a pipeline); $unionWith needs 4.4+.
+    """
+    projection = {'_id': 0, **{field: 1 for field in LIST_FIELDS}}
+    return [
+        {'$project': projection},
+        name_lookup(manager_collection_name, 'manager_match'),
+        {'$set': {'is_manager': {'$gt': [{'$size': '$manager_match'}, 0]}}},
+        {'$unionWith': {
+            'coll': manager_collection_name,
+            'pipeline': [
+                {'$project': projection},
+                name_lookup(employee_collection_name, 'employee_match'),
+                {'$match': {'employee_match': {'$size': 0}}},
+                {'$set': {'is_manager': True}},
+            ],
+        }},
+        {'$project': {
+            '_id': 0,
+            'name': or_dash('$name'),
+            'reporting_manager': or_dash('$reporting_manager'),
+            'status': {'$cond': [is_missing('$tenure_in_current_role'), 'In Progress', 'Completed']},
+            'role': {'$cond': ['$is_manager', 'Manager',
+                               {'$cond': [is_missing('$role'), 'Employee', '$role']}]},
+        }},
+    ]
+
+
+def dashboard_summary(employees_collection, manager_collection_name='manager_users'):
+    """
+    Builds the /api/dashboard-data response from dashboard_pipeline(). Rows are tallied as the
+    cursor streams; folding the lists into a $facet would put every row into a single result
+    document, which is capped at 16 MB.
+    """
+    employee_list, manager_list = [], []
+    employee_total = employee_completed = 0
+    pipeline = dashboard_pipeline(manager_collection_name, employees_collection.name)
+
+    for row in employees_collection.aggregate(pipeline):
+        if row['role'] != 'Manager':
+            employee_total += 1
+            employee_completed += row['status'] == 'Completed'
+        # Any role other than 'Employee' (managers, HR, ...) is listed with the managers.
+        if row['role'] == 'Employee':
+            employee_list.append(row)
+        else:
+            manager_list.append(row)
+
+    return {
+        'total_personnel': len(employee_list) + len(manager_list),
+        'employee_total': employee_total,
+        'manager_total': len(manager_list),
+        'employee_completed': employee_completed,
+        'employee_in_progress': employee_total - employee_completed,
+        'employee_list': employee_list,
+        'manager_list': manager_list,
+    }
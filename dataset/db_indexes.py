@@ -0,0 +1,152 @@
+import os
+import sys
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+UNIQUE = True
+
+# Every index the app's queries rely on: collection -> [(field, index name, unique)].
+# Names are fixed so repeated startups (and several workers starting at once) are no-ops.
+# Unique indexes only cover string values (see unique_options), so records without an
+# employee_id or email, like CSV rows imported without one, don't collide on null.
+INDEX_SPECS = {
+    'employees': [
+        ('employee_id', 'employee_id_1', UNIQUE),
+        ('name', 'name_1', False),
+        ('reporting_manager', 'reporting_manager_1', False),
+    ],
+    # Uploads are staged as-is, duplicates included.
+    'staging_employees': [
+        ('employee_id', 'employee_id_1', False),
+        ('name', 'name_1', False),
+    ],
+    'tasks': [
+        ('assigned_to_id', 'assigned_to_id_1', False),
+        ('assigned_to_emp_id', 'assigned_to_emp_id_1', False),
+    ],
+    'hr_users': [
+        ('email', 'email_1', UNIQUE),
+    ],
+    'manager_users': [
+        ('email', 'email_1', UNIQUE),
+        ('employee_id', 'employee_id_1', UNIQUE),
+        ('name', 'name_1', False),
+    ],
+    'employee_users': [
+        ('email', 'email_1', UNIQUE),
+        ('employee_id', 'employee_id_1', UNIQUE),
+    ],
+}
+
+# Filtered query shapes issued by app.py, create_user.py and import_csv_to_mongo.py.
+# Unfiltered reads (find({})) are full scans by design and are not listed.
+QUERY_SHAPES = [
+    ('employees', {'employee_id': 'EMP0001'}),
+    ('employees', {'employee_id': {'$in': ['EMP0001', 'EMP0002']}}),
+    ('employees', {'name': 'Jane Doe'}),
+    ('employees', {'reporting_manager': 'Jane Doe'}),
+    ('staging_employees', {'name': 'Jane Doe'}),
+    ('tasks', {'assigned_to_emp_id': 'EMP0001'}),
+    ('tasks', {'assigned_to_id': ObjectId('0' * 24)}),
+    ('hr_users', {'email': 'user@example.com'}),
+    ('manager_users', {'email': 'user@example.com'}),
+    ('manager_users', {'employee_id': 'EMP0001'}),
+    ('manager_users', {'name': 'Jane Doe'}),
+    ('employee_users', {'email': 'user@example.com'}),
+    ('employee_users', {'employee_id': 'EMP0001'}),
+]
+
+
+def unique_options(field):
+    return {'unique': True, 'partialFilterExpression': {field: {'$type': 'string'}}}
+
+
+def find_duplicates(collection, field, sample=5):
+    """Up to `sample` (value, count) pairs for string values of `field` held by more than one document."""
+    pipeline = [
+        {'$match': {field: {'$type': 'string'}}},
+        {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+        {'$sort': {'count': -1}},
+        {'$limit': sample},
+    ]
+    return [(doc['_id'], doc['count']) for doc in collection.aggregate(pipeline, allowDiskUse=True)]
+
+
+def ensure_indexes(db):
+    """
+    Creates any missing index from INDEX_SPECS. Safe to call on every startup. Plain indexes left
+    by earlier versions are rebuilt as unique where the spec says so, unless the collection already
+    holds duplicate values: those are reported and returned as {'collection.field': [(value, count)]}
+    and the old index is kept until they are cleaned up.
+    """
+    duplicates = {}
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        for field, name, unique in specs:
+            try:
+                if not unique:
+                    collection.create_index([(field, ASCENDING)], name=name, background=True)
+                    continue
+                current = collection.index_information().get(name)
+                if current is not None and current.get('unique'):
+                    continue
+                found = find_duplicates(collection, field)
+                if found:
+                    duplicates[f"{collection_name}.{field}"] = found
+                    listed = ', '.join(f"{value!r} x{count}" for value, count in found)
+                    print(f"⚠️ Not making {collection_name}.{field} unique, duplicate values found: {listed}")
+                    continue
+                if current is not None:
+                    collection.drop_index(name)
+                collection.create_index([(field, ASCENDING)], name=name, background=True, **unique_options(field))
+            except Exception as e:
+                print(f"⚠️ Could not create index {collection_name}.{name}: {e}")
+    return duplicates
+
+
+def plan_stages(plan):
+    """Yields every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+def explain_query_shapes(db):
+    """Runs explain() for every entry in QUERY_SHAPES and returns a list of (collection, filter, stages)."""
+    report = []
+    for collection_name, query in QUERY_SHAPES:
+        explanation = db[collection_name].find(query).explain()
+        winning_plan = explanation.get('queryPlanner', {}).get('winningPlan', {})
+        report.append((collection_name, query, sorted(set(plan_stages(winning_plan)))))
+    return report
+
+
+if __name__ == '__main__':
+    # Usage: python db_indexes.py ensure   |   python db_indexes.py explain
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    database = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))['hr_data']
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'ensure':
+        if ensure_indexes(database):
+            print("❌ Some unique indexes are missing; remove the duplicates listed above and run again.")
+            sys.exit(1)
+        print("✅ Indexes are in place.")
+    else:
+        collection_scans = 0
+        for collection_name, query, stages in explain_query_shapes(database):
+            if 'COLLSCAN' in stages:
+                collection_scans += 1
+                print(f"❌ COLLSCAN  {collection_name} {query} -> {', '.join(stages)}")
+            else:
+                print(f"✅ indexed   {collection_name} {query} -> {', '.join(stages)}")
+        sys.exit(1 if collection_scans else 0)
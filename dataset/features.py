@@ -0,0 +1,66 @@
+import math
+import numpy as np
+
+
+def to_feature_value(value):
+    """
+    Converts a raw Mongo field value to a model input the same way
+    pd.to_numeric(errors='coerce').fillna(0) does: anything missing or non-numeric becomes 0.
+    """
+    if value is None:
+        return 0.0
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+
+class FeatureVectorBuilder:
+    """
+    Turns employee documents into model input matrices for one model's feature list.
+    The column index map is computed once at startup, so building a row is a single pass
+    over the document's fields with no DataFrame involved.
+    """
+
+    def __init__(self, features):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+        self.width = len(self.features)
+
+    def _fill_row(self, row, doc):
+        index = self.index
+        for key, value in doc.items():
+            i = index.get(key)
+            if i is not None:
+                row[i] = to_feature_value(value)
+
+    def build(self, doc):
+        """Returns a contiguous float32 matrix of shape (1, n_features) for a single document."""
+        matrix = np.zeros((1, self.width), dtype=np.float32)
+        self._fill_row(matrix[0], doc)
+        return matrix
+
+    def build_batch(self, docs):
+        """Returns a contiguous float32 matrix of shape (len(docs), n_features)."""
+        matrix = np.zeros((len(docs), self.width), dtype=np.float32)
+        for row, doc in zip(matrix, docs):
+            self._fill_row(row, doc)
+        return matrix
+
+
+class FeatureAssembler:
+    """Holds one FeatureVectorBuilder per model so every route assembles inputs the same way."""
+
+    def __init__(self, promotion_features, attrition_features, anomaly_features):
+        self.promotion = FeatureVectorBuilder(promotion_features)
+        self.attrition = FeatureVectorBuilder(attrition_features)
+        self.anomaly = FeatureVectorBuilder(anomaly_features)
+
+    def build(self, doc):
+        """Returns (promotion, attrition, anomaly) input matrices for a single document."""
+        return self.promotion.build(doc), self.attrition.build(doc), self.anomaly.build(doc)
+
+    def build_batch(self, docs):
+        """Returns (promotion, attrition, anomaly) input matrices for a list of documents."""
+        return self.promotion.build_batch(docs), self.attrition.build_batch(docs), self.anomaly.build_batch(docs)
@@ -1,6 +1,8 @@
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 import numpy as np # For handling NaN values
+from insights_store import InsightsStore, TRACKED_FIELDS
+from response_cache import bump_versions
 
 # MongoDB Configuration (match these with your app.py if you changed them)
 MONGO_URI = 'mongodb://localhost:27017/'
@@ -15,6 +17,7 @@ def import_csv_data():
         client = MongoClient(MONGO_URI)
         db = client[DB_NAME]
         employees_collection = db[EMPLOYEES_COLLECTION]
+        insights_store = InsightsStore(db, employees_collection)
 
         # Read CSV into pandas DataFrame
         df = pd.read_csv(CSV_FILE_PATH)
@@ -34,20 +37,28 @@ def import_csv_data():
         for record in data_to_insert:
             employee_id = record.get('employee_id')
             if employee_id:
-                result = employees_collection.update_one(
+                # The pre-update image lets the insights aggregates move by exactly this record's delta.
+                before = employees_collection.find_one_and_update(
                     {'employee_id': employee_id},
                     {'$set': record},
-                    upsert=True
+                    projection={field: 1 for field in TRACKED_FIELDS},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
                 )
-                if result.upserted_id:
+                after = {**(before or {}), **{field: record[field] for field in TRACKED_FIELDS if field in record}}
+                insights_store.apply_change(before, after)
+                if before is None:
                     inserted_count += 1
-                elif result.matched_count > 0:
+                else:
                     updated_count += 1
             else:
                 # If no employee_id, just insert as new (consider if this is desired)
                 employees_collection.insert_one(record)
+                insights_store.apply_change(None, record)
                 inserted_count += 1
         
+        # Dashboard responses cached by the app are keyed on this counter.
+        bump_versions(db, EMPLOYEES_COLLECTION)
         print(f"Import complete. Inserted: {inserted_count} new records, Updated: {updated_count} existing records.")
 
     except FileNotFoundError:
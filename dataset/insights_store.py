@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from pymongo import UpdateOne
+
+OVERALL_COLUMN = 'overall_weighted_score'
+CATEGORY_COLUMNS = [
+    'leadership_score',
+    'integrity_feedback_score',
+    'collaboration_communication_score',
+    'adaptability_growth_score',
+    'skill_development_score',
+    'effort_engagement_score',
+]
+RADAR_COLUMNS = [
+    'leadership_score',
+    'collaboration_communication_score',
+    'adaptability_growth_score',
+    'skill_development_score',
+    'effort_engagement_score',
+]
+SCORE_COLUMNS = [OVERALL_COLUMN] + CATEGORY_COLUMNS
+# The only employee fields the store reads, used as the projection for before/after images.
+TRACKED_FIELDS = SCORE_COLUMNS + ['department', 'evaluation_month']
+
+DEPARTMENT = 'department'
+MONTH = 'month'
+
+# Shown when no employee has an evaluation_month (same placeholder series as before).
+DEMO_TRENDS = [
+    {'month': 'Jan', 'avg_score': 3.2},
+    {'month': 'Feb', 'avg_score': 3.5},
+    {'month': 'Mar', 'avg_score': 3.7},
+    {'month': 'Apr', 'avg_score': 3.9},
+    {'month': 'May', 'avg_score': 4.0},
+]
+
+
+def to_number(value):
+    """pd.to_numeric(errors='coerce') for a single value: None for anything that is not a number, and for NaN."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def is_present(value):
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+def label(column):
+    return column.replace('_score', '').replace('_', ' ').title()
+
+
+def contribution(doc):
+    """
+    What one employee document adds to the store, as {(kind, key): {counter: amount}}.
+    Documents without a numeric overall_weighted_score add nothing, as they were dropped before.
+    """
+    if not doc:
+        return {}
+    overall = to_number(doc.get(OVERALL_COLUMN))
+    if overall is None:
+        return {}
+
+    department = doc.get('department')
+    department_counters = {'rows': 1}
+    for column in SCORE_COLUMNS:
+        value = to_number(doc.get(column))
+        if value is not None:
+            department_counters[f'sums.{column}'] = value
+            department_counters[f'counts.{column}'] = 1
+    groups = {(DEPARTMENT, department if is_present(department) else None): department_counters}
+
+    month = doc.get('evaluation_month')
+    if is_present(month):
+        groups[(MONTH, month)] = {'rows': 1, f'sums.{OVERALL_COLUMN}': overall}
+    return groups
+
+
+def difference(before, after):
+    """contribution(after) - contribution(before), dropping counters that did not move."""
+    delta = {}
+    for sign, groups in ((-1, contribution(before)), (1, contribution(after))):
+        for group, counters in groups.items():
+            for counter, amount in counters.items():
+                bucket = delta.setdefault(group, {})
+                bucket[counter] = bucket.get(counter, 0) + sign * amount
+    return {group: {c: a for c, a in counters.items() if a != 0}
+            for group, counters in delta.items() if any(a != 0 for a in counters.values())}
+
+
+class InsightsStore:
+    """
+    Materialized /api/insights aggregates: one document per department and per evaluation month
+    in the 'insights_aggregates' collection, holding a row count plus running sums and counts
+    for each score column. Employee writes apply the difference between the document's before
+    and after images with $inc, so reads cost O(departments). rebuild() recomputes everything
+    from the employees collection and runs periodically to heal drift (float error, writes that
+    bypassed the app, or updates lost to a crash between the write and the delta).
+    """
+
+    def __init__(self, db, employees_collection, collection_name='insights_aggregates'):
+        self.collection = db[collection_name]
+        self.employees = employees_collection
+        self._rebuild_lock = threading.Lock()
+        self.deltas_applied = 0
+        self.delta_errors = 0
+        self.rebuilds = 0
+        self.last_rebuild = None
+
+    # --- Writes -------------------------------------------------------------------------------
+
+    def snapshot(self, query):
+        return self.employees.find_one(query, {field: 1 for field in TRACKED_FIELDS})
+
+    def apply_change(self, before, after):
+        """Applies the store delta for an employee document going from `before` to `after` (None = absent)."""
+        delta = difference(before, after)
+        if not delta:
+            return
+        try:
+            self.collection.bulk_write([
+                UpdateOne({'_id': {'kind': kind, 'key': key}},
+                          {'$inc': counters, '$set': {'kind': kind, 'key': key}}, upsert=True)
+                for (kind, key), counters in delta.items()
+            ], ordered=False)
+            self.deltas_applied += 1
+        except Exception as e:
+            # The next rebuild picks the change up; the employee write itself has already succeeded.
+            self.delta_errors += 1
+            print(f"⚠️ Could not update insights aggregates: {e}")
+
+    @contextmanager
+    def tracking(self, query):
+        """Wraps a write to one employee document: snapshots it before and after, then applies the delta."""
+        before = self.snapshot(query)
+        yield
+        self.apply_change(before, self.snapshot(query))
+
+    def rebuild(self):
+        """Recomputes every aggregate from the employees collection and replaces the stored ones."""
+        with self._rebuild_lock:
+            totals = {}
+            for doc in self.employees.find({}, {field: 1 for field in TRACKED_FIELDS}):
+                for group, counters in contribution(doc).items():
+                    bucket = totals.setdefault(group, {})
+                    for counter, amount in counters.items():
+                        bucket[counter] = bucket.get(counter, 0) + amount
+
+            for (kind, key), counters in totals.items():
+                document = {'kind': kind, 'key': key, 'rows': counters.get('rows', 0), 'sums': {}, 'counts': {}}
+                for counter, amount in counters.items():
+                    if '.' in counter:
+                        field, column = counter.split('.', 1)
+                        document[field][column] = amount
+                self.collection.replace_one({'_id': {'kind': kind, 'key': key}}, document, upsert=True)
+            stale = [doc['_id'] for doc in self.collection.find({}, {'_id': 1})
+                     if (doc['_id']['kind'], doc['_id']['key']) not in totals]
+            if stale:
+                self.collection.delete_many({'_id': {'$in': stale}})
+
+            self.rebuilds += 1
+            self.last_rebuild = time.time()
+            return len(totals)
+
+    def rebuild_periodically(self, interval, on_rebuild=None):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    groups = self.rebuild()
+                    print(f"♻️ Insights aggregates rebuilt ({groups} groups)")
+                    if on_rebuild:
+                        on_rebuild()
+                except Exception as e:
+                    print(f"❌ Insights rebuild failed: {e}")
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+    # --- Reads --------------------------------------------------------------------------------
+
+    def insights(self):
+        """The /api/insights payload (minus the 404 check), built from the stored aggregates."""
+        departments, months = [], []
+        for doc in self.collection.find({'rows': {'$gt': 0}}):
+            (departments if doc['kind'] == DEPARTMENT else months).append(doc)
+
+        def total(field, column):
+            return sum(doc.get(field, {}).get(column, 0) for doc in departments)
+
+        def mean(column):
+            count = total('counts', column)
+            return round(total('sums', column) / count, 2) if count else 0.0
+
+        rows = sum(doc['rows'] for doc in departments)
+        overall_score = round(total('sums', OVERALL_COLUMN) / rows, 2) if rows else 0.0
+        category_scores = [{'category': label(column), 'score': mean(column)} for column in CATEGORY_COLUMNS]
+        skill_balance = [{'skill': label(column), 'value': mean(column)} for column in RADAR_COLUMNS]
+
+        if months:
+            trends = [{'month': doc['key'], 'avg_score': round(doc['sums'][OVERALL_COLUMN] / doc['rows'], 2)}
+                      for doc in sorted(months, key=lambda doc: str(doc['key']))]
+        else:
+            trends = DEMO_TRENDS
+
+        heatmap = []
+        heatmap_columns = [column for column in RADAR_COLUMNS if total('counts', column)]
+        for doc in sorted((d for d in departments if d['key'] is not None), key=lambda d: str(d['key'])):
+            entry = {'team': doc['key']}
+            for column in heatmap_columns:
+                count = doc.get('counts', {}).get(column, 0)
+                entry[label(column)] = round(doc['sums'][column] / count, 2) if count else None
+            heatmap.append(entry)
+
+        return {
+            'overall_score': overall_score,
+            'category_scores': category_scores,
+            'skill_balance': skill_balance,
+            'monthly_trends': trends,
+            'team_heatmap': heatmap,
+        }
+
+    def is_empty(self):
+        return self.collection.find_one({}, {'_id': 1}) is None
+
+    def stats(self):
+        return {
+            'deltas_applied': self.deltas_applied,
+            'delta_errors': self.delta_errors,
+            'rebuilds': self.rebuilds,
+            'last_rebuild': self.last_rebuild,
+        }
@@ -0,0 +1,152 @@
+import re
+import threading
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import FeatureUnion, make_pipeline
+
+# Intents answered locally. Anything else ('llm') goes to Gemini as before.
+GREETING = 'greeting'
+THANKS = 'thanks'
+PROMOTION_LOOKUP = 'promotion_lookup'
+ATTRITION_LOOKUP = 'attrition_lookup'
+OFF_TOPIC = 'off_topic'
+LLM = 'llm'
+
+# Intents whose answer needs the employee's predictions.
+DATA_INTENTS = {PROMOTION_LOOKUP, ATTRITION_LOOKUP}
+
+# Exact-shape rules, checked before the model. Anything asking "how/why/improve" is left to Gemini,
+# since those answers need personalised recommendations.
+KEYWORD_RULES = [
+    (GREETING, re.compile(r"^(hi|hello|hey|hiya|good (morning|afternoon|evening)|greetings)( there)?( evalmate)?[!. ]*$")),
+    (THANKS, re.compile(r"^(thanks|thank you|thank u|thx|ty|cheers|great,? thanks|ok(ay)?,? thanks)( a lot| so much| evalmate)?[!. ]*$")),
+    (PROMOTION_LOOKUP, re.compile(r"^what('s| is) my (promotion|promotion readiness) (score|level|rating)\??$")),
+    (ATTRITION_LOOKUP, re.compile(r"^what('s| is) my (attrition|attrition risk|flight risk)( level| rating)?\??$")),
+]
+NEEDS_LLM = re.compile(r"\b(how|why|improve|increase|reduce|lower|raise|better|tips|advice|should|explain|compare)\b")
+
+# Seed utterances for the text model. Kept small on purpose: the model only has to separate a
+# handful of scripted intents from everything that deserves a real answer.
+INTENT_EXAMPLES = {
+    GREETING: [
+        "hi", "hello", "hey there", "good morning", "hello evalmate", "hey, hope you're well",
+        "hi there!", "good afternoon", "yo", "hello, anyone there?",
+    ],
+    THANKS: [
+        "thanks", "thank you so much", "thanks for the help", "ok thanks", "great, thank you",
+        "appreciate it", "cheers", "thanks a lot, that helps", "that's helpful thank you",
+    ],
+    PROMOTION_LOOKUP: [
+        "what is my promotion score", "show my promotion readiness", "what's my promotion level",
+        "tell me my promotion score", "promotion readiness score?", "am I ready for promotion",
+        "what is my readiness level for promotion", "give me my promotion rating",
+        "my promotion score please", "what promotion level am I at",
+    ],
+    ATTRITION_LOOKUP: [
+        "what is my attrition risk", "show my attrition level", "what's my attrition risk level",
+        "tell me my attrition risk", "attrition risk?", "am I an attrition risk",
+        "what is my flight risk", "my attrition rating please", "what attrition level am I",
+    ],
+    OFF_TOPIC: [
+        "what's the weather today", "write me a poem", "who won the football match",
+        "what is the capital of france", "tell me a joke", "can you book a flight for me",
+        "what's the stock price of apple", "recommend a good movie", "how do I cook pasta",
+        "translate this to spanish", "what is 2 plus 2", "who is the president",
+        "write python code for sorting", "what time is it in tokyo",
+    ],
+    LLM: [
+        "how can I improve my promotion score", "why is my attrition risk high",
+        "summarize my performance", "how am I doing", "what does my manager think of me",
+        "how can I reduce my attrition risk", "what should I work on next",
+        "give me tips to get promoted", "explain my kpi scores", "what did my peers say about me",
+        "how do I become ready for promotion", "what are my strengths and weaknesses",
+        "what feedback did I get", "how can I improve my leadership score",
+        "why am I not ready for promotion", "what can I do to grow in my role",
+    ],
+}
+
+GREETING_RESPONSE = ("Hello! I'm EvalMate. I'm here to help with questions about your performance evaluation. "
+                     "What can I assist you with today?")
+THANKS_RESPONSE = "You're welcome! Let me know if there's anything else about your evaluation I can help with."
+OFF_TOPIC_RESPONSE = ("I'm sorry, I can only assist with questions related to your performance data. "
+                      "You can ask me about your promotion readiness, attrition risk, or manager feedback.")
+
+
+def normalize_query(query):
+    return re.sub(r'\s+', ' ', query.lower()).strip()
+
+
+class IntentRouter:
+    """
+    Answers scripted chatbot queries (greetings, thanks, score lookups, off-topic refusals)
+    locally. Keyword rules handle the exact shapes; a TF-IDF + logistic regression model trained
+    on INTENT_EXAMPLES at startup handles paraphrases, and only routes locally when it is at
+    least `threshold` confident. Everything else is sent to the LLM.
+    """
+
+    def __init__(self, threshold=0.6):
+        self.threshold = threshold
+        texts = [text for examples in INTENT_EXAMPLES.values() for text in examples]
+        labels = [intent for intent, examples in INTENT_EXAMPLES.items() for _ in examples]
+        self.model = make_pipeline(
+            FeatureUnion([
+                ('words', TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+                ('chars', TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True)),
+            ]),
+            LogisticRegression(C=10, max_iter=1000)
+        )
+        self.model.fit(texts, labels)
+        self._lock = threading.Lock()
+        self.counts = {intent: 0 for intent in INTENT_EXAMPLES}
+        self.total = 0
+
+    def classify(self, query):
+        """Returns (intent, source) where source is 'rule' or 'model'."""
+        text = normalize_query(query)
+        intent, source = LLM, 'model'
+        for rule_intent, pattern in KEYWORD_RULES:
+            if pattern.match(text):
+                intent, source = rule_intent, 'rule'
+                break
+        else:
+            probabilities = self.model.predict_proba([text])[0]
+            best = probabilities.argmax()
+            if probabilities[best] >= self.threshold:
+                intent = str(self.model.classes_[best])
+            # Scripted lookups never answer "how/why" questions, whatever the model thinks.
+            if intent in DATA_INTENTS and NEEDS_LLM.search(text):
+                intent = LLM
+
+        with self._lock:
+            self.total += 1
+            self.counts[intent] += 1
+        return intent, source
+
+    def respond(self, intent, chat_context=None):
+        if intent == GREETING:
+            return GREETING_RESPONSE
+        if intent == THANKS:
+            return THANKS_RESPONSE
+        if intent == OFF_TOPIC:
+            return OFF_TOPIC_RESPONSE
+        if intent == PROMOTION_LOOKUP:
+            promotion = chat_context['promotion']
+            return (f"Your promotion readiness score is {promotion['score']}, which is rated "
+                    f"'{promotion['level']}'. {promotion['recommendation']}. "
+                    f"Would you like some suggestions on how to build on it?")
+        if intent == ATTRITION_LOOKUP:
+            attrition = chat_context['attrition']
+            return (f"Your attrition risk is currently considered '{attrition['risk_level']}'. "
+                    f"{attrition['recommendation']}. Would you like to talk through what drives it?")
+        return None
+
+    def stats(self):
+        with self._lock:
+            local = self.total - self.counts[LLM]
+            return {
+                'queries': self.total,
+                'answered_locally': local,
+                'hit_rate': round(local / self.total, 3) if self.total else 0.0,
+                'by_intent': dict(self.counts),
+            }
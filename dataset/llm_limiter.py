@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+# Lower number = served first. Chat is interactive, reports are user-initiated, bulk runs can wait.
+LANES = {'chat': 0, 'report': 1, 'bulk': 2}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller could not get a slot within its lane's wait limit."""
+
+
+class TokenBucket:
+    """In-process token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def wait_hint(self):
+        """Seconds until the next token is due."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class RedisTokenBucket:
+    """Token bucket kept in Redis so every gunicorn worker draws from the same quota."""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local granted = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        granted = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    return granted
+    """
+
+    def __init__(self, url, rate, capacity, key='llm_limiter:gemini'):
+        import redis
+        self.rate = rate
+        self.capacity = capacity
+        self._redis = redis.Redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+        self._key = key
+
+    def try_acquire(self):
+        return bool(self._script(keys=[self._key], args=[self.rate, self.capacity, time.time()]))
+
+    def wait_hint(self):
+        return min(0.25, 1 / self.rate)
+
+
+def is_rate_limit_error(error):
+    text = str(error)
+    return '429' in text or 'ResourceExhausted' in type(error).__name__ or 'quota' in text.lower()
+
+
+class LLMRateLimiter:
+    """
+    Gates every LLM call behind a token bucket. Waiting callers are served strictly by lane
+    priority (then arrival order), so a chat message never queues behind a bulk report run.
+    Calls that still get a 429 are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, bucket, lane_timeouts=None, max_retries=4, backoff_base=2.0, backoff_max=60.0):
+        self.bucket = bucket
+        self.lane_timeouts = lane_timeouts or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self.calls = {lane: 0 for lane in LANES}
+        self.throttled = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+
+    def acquire(self, lane='report', timeout=None):
+        """
+        Blocks until this caller is at the head of the queue and a token is available, for at most
+        the lane's wait limit or `timeout` seconds, whichever is shorter.
+        """
+        lane_timeout = self.lane_timeouts.get(lane)
+        if timeout is None or (lane_timeout and lane_timeout < timeout):
+            timeout = lane_timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        ticket = (LANES[lane], next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+            try:
+                while True:
+                    if self._waiting[0] == ticket and self.bucket.try_acquire():
+                        heapq.heappop(self._waiting)
+                        self.calls[lane] += 1
+                        return
+                    wait = self.bucket.wait_hint() if self._waiting[0] == ticket else None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            raise RateLimitTimeout(f"No LLM capacity for the '{lane}' lane within {timeout:.1f} s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+            finally:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def backoff_delay(self, attempt):
+        # "Full jitter": a random wait up to the exponential cap spreads retries from many workers.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn, *args, lane='report', deadline=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) once a slot is free, retrying rate-limit errors with backoff.
+        `deadline` (a time.monotonic() value) bounds the waits and retries: a slot that is not free
+        by then raises RateLimitTimeout, and a 429 whose backoff would run past it is re-raised.
+        """
+        for attempt in range(self.max_retries + 1):
+            if deadline is None:
+                self.acquire(lane)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise RateLimitTimeout(f"Deadline passed before an LLM slot was free ({lane})")
+                self.acquire(lane, remaining)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.throttled += 1
+                delay = self.backoff_delay(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                print(f"⚠️ Gemini rate limited ({lane}), retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def queue_depth(self):
+        with self._condition:
+            depth = {lane: 0 for lane in LANES}
+            for priority, _ in self._waiting:
+                depth[next(lane for lane, p in LANES.items() if p == priority)] += 1
+            return depth
+
+    def stats(self):
+        return {
+            'queue_depth': self.queue_depth(),
+            'max_queue_depth': self.max_queue_depth,
+            'calls': dict(self.calls),
+            'throttled_retries': self.throttled,
+            'timeouts': self.timeouts,
+        }
+
+
+def create_llm_limiter(rate_per_minute, burst, redis_url=None, **kwargs):
+    rate = rate_per_minute / 60.0
+    bucket = RedisTokenBucket(redis_url, rate, burst) if redis_url else TokenBucket(rate, burst)
+    return LLMRateLimiter(bucket, **kwargs)
@@ -0,0 +1,74 @@
+import re
+from collections import Counter
+
+from textblob import TextBlob
+
+# Theme keywords, mirroring the examples the Gemini prompt asks for (leadership, punctuality,
+# communication, ...). A theme is reported when any of its stems occurs in the feedback.
+THEME_KEYWORDS = {
+    'leadership': ['lead', 'mentor', 'guid', 'initiative', 'vision', 'delegat'],
+    'communication': ['communicat', 'listen', 'articulat', 'present', 'clear', 'follow up', 'follows up'],
+    'punctuality': ['punctual', 'late', 'on time', 'deadline', 'timel'],
+    'teamwork': ['team', 'collaborat', 'colleague', 'peer', 'support', 'helpful'],
+    'client relations': ['client', 'customer', 'stakeholder'],
+    'reliability': ['reliab', 'dependab', 'consisten', 'solid', 'trust'],
+    'technical skills': ['code', 'technical', 'bug', 'deploy', 'model', 'engineer'],
+    'time management': ['time management', 'prioriti', 'organiz', 'work-life', 'balance'],
+    'ownership': ['ownership', 'accountab', 'responsib', 'proactive'],
+    'adaptability': ['adapt', 'flexib', 'learn', 'growth', 'improv'],
+    'quality of work': ['quality', 'efficien', 'thorough', 'professional', 'detail'],
+}
+
+STOPWORDS = set("""
+a an and are as at be been but by can could did do does for from had has have he her his i in is it its
+just may more most my not of on or our she should so some such than that the their them they this to too
+very was we were what when which who will with would you your also has shown find work working well
+""".split())
+
+
+def _sentences(text):
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text) if len(s.strip()) > 3]
+
+
+def _strip_label(sentence):
+    # Feedback lines are built as "Manager Comments: ...", "Peer Reviews: ..."
+    return re.sub(r'^[A-Z][A-Za-z ]{2,30}:\s*', '', sentence)
+
+
+def extract_themes(text, limit=3):
+    lowered = text.lower()
+    scores = Counter({theme: sum(lowered.count(stem) for stem in stems) for theme, stems in THEME_KEYWORDS.items()})
+    themes = [theme for theme, count in scores.most_common(limit) if count > 0]
+    if themes:
+        return themes
+    # No known theme: fall back to the most frequent content words.
+    words = [w for w in re.findall(r"[a-z][a-z\-]{3,}", lowered) if w not in STOPWORDS]
+    return [word for word, _ in Counter(words).most_common(limit)]
+
+
+def sentiment_label(polarity):
+    if polarity > 0.1:
+        return 'Positive'
+    if polarity < -0.05:
+        return 'Negative'
+    return 'Neutral'
+
+
+def summarize_feedback_locally(text):
+    """
+    Offline stand-in for summarize_feedback_gemini, returning the same four fields: TextBlob
+    polarity gives the sentiment and soft-skills score, keyword matching gives the themes, and
+    the sentence that best matches the overall tone becomes the one-line summary.
+    """
+    polarity = TextBlob(text).sentiment.polarity
+    sentences = [_strip_label(s) for s in _sentences(text)] or [text.strip()]
+    # Prefer the sentence whose own polarity is closest to the overall tone, then the longer one.
+    best = max(sentences, key=lambda s: (-abs(TextBlob(s).sentiment.polarity - polarity), len(s)))
+    themes = extract_themes(text)
+
+    return (
+        f"1. Sentiment: {sentiment_label(polarity)}\n"
+        f"2. Key themes: {', '.join(themes) if themes else 'general performance'}\n"
+        f"3. One-line summary: {best}\n"
+        f"4. Soft-skills score: {max(-1.0, min(1.0, polarity)):+.2f}"
+    )
@@ -0,0 +1,206 @@
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from features import FeatureAssembler
+from tree_engine import FAST_PATH_MAX_ROWS
+
+# Every artifact the scoring paths need. They are always loaded and swapped together.
+MODEL_SET_NAMES = [
+    'promotion_model', 'promotion_features',
+    'attrition_model', 'attrition_features', 'label_encoder',
+    'anomaly_model',
+]
+
+
+class ModelSet:
+    """One consistent generation of models, feature lists and the assembler built from them."""
+
+    def __init__(self, loaded, generation):
+        self.loaded = loaded
+        self.generation = generation
+        self.promotion_model = loaded['promotion_model'].artifact
+        self.promotion_features = loaded['promotion_features'].artifact
+        self.attrition_model = loaded['attrition_model'].artifact
+        self.attrition_features = loaded['attrition_features'].artifact
+        self.label_encoder = loaded['label_encoder'].artifact
+        self.anomaly_model = loaded['anomaly_model'].artifact
+        self.anomaly_features = self.anomaly_model.features
+        self.feature_assembler = FeatureAssembler(self.promotion_features, self.attrition_features, self.anomaly_features)
+        # Combined id of the loaded versions, so predictions made by older models are never reused.
+        self.version = hashlib.blake2b(
+            '|'.join(f"{name}@{loaded[name].version}" for name in MODEL_SET_NAMES).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+        self.in_flight = 0
+
+    def versions(self):
+        return {name: loaded.version for name, loaded in self.loaded.items()}
+
+    def warm_up(self):
+        """
+        Checks every model against its feature list and runs a warm-up prediction through both the
+        single-row and the batch path. Raises ValueError if the set is not safe to serve.
+        """
+        for model, features, label in [(self.promotion_model, self.promotion_features, 'promotion_model'),
+                                       (self.attrition_model, self.attrition_features, 'attrition_model'),
+                                       (self.anomaly_model.model, self.anomaly_features, 'anomaly_model')]:
+            expected = getattr(model, 'n_features_in_', None)
+            if expected is not None and expected != len(features):
+                raise ValueError(f"{label} expects {expected} features but its feature list has {len(features)}")
+
+        for n_rows in (1, FAST_PATH_MAX_ROWS + 1):
+            promo_input, attrition_input, anomaly_input = self.feature_assembler.build_batch([{}] * n_rows)
+            promo_scores = np.asarray(self.promotion_model.predict(promo_input), dtype=np.float64)
+            attr_labels = self.label_encoder.inverse_transform(self.attrition_model.predict(attrition_input))
+            _, anomaly_scores, reasons = self.anomaly_model.predict_with_reason(anomaly_input)
+            if len(promo_scores) != n_rows or len(attr_labels) != n_rows or len(reasons) != n_rows:
+                raise ValueError("Warm-up prediction returned the wrong number of rows")
+            if not (np.isfinite(promo_scores).all() and np.isfinite(anomaly_scores).all()):
+                raise ValueError("Warm-up prediction returned non-finite scores")
+
+    def stats(self):
+        return [loaded.stats() for loaded in self.loaded.values()]
+
+
+class ModelManager:
+    """
+    Owns the active ModelSet and swaps in new ones without a restart.
+
+    Requests pin the set they started with, so a swap never changes models halfway through a
+    request. A retired set is dropped once its last in-flight request finishes.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.active = None
+        self.retired = []
+        self.generation = 0
+        self.reload_status = {'state': 'idle'}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watched_mtimes = {}
+
+    def load(self, versions=None):
+        """Loads and validates a ModelSet from the registry (current versions unless overridden)."""
+        versions = versions or {}
+        loaded = {name: self.registry.load(name, versions.get(name)) for name in MODEL_SET_NAMES}
+        with self._lock:
+            self.generation += 1
+            generation = self.generation
+        model_set = ModelSet(loaded, generation)
+        model_set.warm_up()
+        return model_set
+
+    def activate(self, model_set):
+        """Atomically makes model_set the one new requests use."""
+        with self._lock:
+            previous, self.active = self.active, model_set
+            if previous is not None:
+                self.retired.append(previous)
+            self._release_idle()
+        print(f"✅ Model set generation {model_set.generation} ({model_set.version}) is now active")
+
+    def current(self):
+        return self.active
+
+    @contextlib.contextmanager
+    def pin(self):
+        """Yields the active ModelSet and keeps it alive until the block exits, even across a swap."""
+        with self._lock:
+            model_set = self.active
+            model_set.in_flight += 1
+        try:
+            yield model_set
+        finally:
+            with self._lock:
+                model_set.in_flight -= 1
+                self._release_idle()
+
+    def _release_idle(self):
+        for model_set in [m for m in self.retired if m.in_flight == 0]:
+            self.retired.remove(model_set)
+            print(f"♻️ Released model set generation {model_set.generation} ({model_set.version})")
+
+    def reload(self, versions=None, sources=None):
+        """
+        Publishes `sources` (name -> pickle path) if given, then loads, validates and activates the
+        resulting set. Returns False if another reload is already running.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self.reload_status = {'state': 'loading', 'started_at': datetime.utcnow().isoformat() + 'Z'}
+            versions = dict(versions or {})
+            for name, path in (sources or {}).items():
+                versions[name] = self.registry.publish(name, path, make_current=False)
+
+            model_set = self.load(versions)
+            # Only point CURRENT at the new versions once they have passed warm-up.
+            for name, version in versions.items():
+                self.registry.set_current(name, version)
+            self.activate(model_set)
+            self.reload_status = {'state': 'succeeded', 'generation': model_set.generation,
+                                  'version': model_set.version,
+                                  'finished_at': datetime.utcnow().isoformat() + 'Z'}
+        except Exception as e:
+            print(f"❌ Model reload failed, keeping generation {self.active.generation if self.active else None}: {e}")
+            self.reload_status = {'state': 'failed', 'error': str(e),
+                                  'finished_at': datetime.utcnow().isoformat() + 'Z'}
+        finally:
+            self._reload_lock.release()
+        return True
+
+    def reload_in_background(self, versions=None, sources=None):
+        thread = threading.Thread(target=self.reload, args=(versions, sources), daemon=True)
+        thread.start()
+        return thread
+
+    def _changed_sources(self, sources):
+        changed = {}
+        for name, path in sources.items():
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if self._watched_mtimes.get(name, mtime) != mtime:
+                changed[name] = path
+            self._watched_mtimes[name] = mtime
+        return changed
+
+    def watch(self, sources, interval):
+        """
+        Polls every `interval` seconds. Changed source pickles are published and loaded, and a
+        CURRENT pointer moved by another worker (or the admin endpoint) is picked up as well.
+        """
+        self._changed_sources(sources)  # record the starting mtimes
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    changed = self._changed_sources(sources)
+                    current = {name: self.registry.current_version(name) for name in MODEL_SET_NAMES}
+                    if changed or current != self.active.versions():
+                        self.reload(sources=changed)
+                except Exception as e:
+                    print(f"❌ Model watcher error: {e}")
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        active = self.active
+        return {
+            'generation': active.generation,
+            'model_version': active.version,
+            'models': active.stats(),
+            'retired_in_flight': [{'generation': m.generation, 'in_flight': m.in_flight} for m in self.retired],
+            'reload': self.reload_status,
+        }
@@ -0,0 +1,218 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+
+from anomaly import AnomalyDetectorWithReason
+from tree_engine import CompiledTreeEnsemble, FastPathModel, compile_model
+
+# Classes that older pickles reference through __main__ (they were trained from a notebook/script),
+# mapped to the importable module that now defines them.
+LEGACY_CLASS_ALIASES = {
+    'AnomalyDetectorWithReason': AnomalyDetectorWithReason,
+}
+
+ARTIFACT_FILE = 'artifact.joblib'
+COMPILED_DIR = 'compiled'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+
+@contextlib.contextmanager
+def legacy_class_aliases():
+    """Temporarily exposes LEGACY_CLASS_ALIASES on __main__ while a legacy pickle is read."""
+    main = sys.modules['__main__']
+    added = [name for name in LEGACY_CLASS_ALIASES if not hasattr(main, name)]
+    for name in added:
+        setattr(main, name, LEGACY_CLASS_ALIASES[name])
+    try:
+        yield
+    finally:
+        for name in added:
+            delattr(main, name)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def resident_bytes():
+    """Current resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _compile_target(artifact):
+    # Wrapper objects such as AnomalyDetectorWithReason keep their tree ensemble under .model
+    return artifact.model if isinstance(artifact, AnomalyDetectorWithReason) else artifact
+
+
+class LoadedModel:
+    """A loaded artifact together with the version it came from and what it cost to load."""
+
+    def __init__(self, name, version, artifact, load_seconds, rss_delta_bytes, mapped_bytes):
+        self.name = name
+        self.version = version
+        self.artifact = artifact
+        self.load_seconds = load_seconds
+        self.rss_delta_bytes = rss_delta_bytes
+        self.mapped_bytes = mapped_bytes
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'load_ms': round(self.load_seconds * 1000, 2),
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'mapped_bytes': self.mapped_bytes,
+        }
+
+
+class ModelRegistry:
+    """
+    Versioned on-disk store for model artifacts:
+
+        <root>/<name>/CURRENT                      -> id of the active version
+        <root>/<name>/<version>/artifact.joblib    -> uncompressed joblib dump
+        <root>/<name>/<version>/compiled/*.npy     -> tree node tables, memory-mapped on load
+        <root>/<name>/<version>/manifest.json
+
+    Version ids are content hashes of the published artifact, so publishing the same file twice is a
+    no-op. Node tables are opened read-only with mmap, so every gunicorn worker maps the same pages.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _model_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def versions(self, name):
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(entry for entry in os.listdir(model_dir)
+                      if os.path.isfile(os.path.join(model_dir, entry, MANIFEST_FILE)))
+
+    def current_version(self, name):
+        try:
+            with open(os.path.join(self._model_dir(name), CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_current(self, name, version):
+        if version not in self.versions(name):
+            raise ValueError(f"Unknown version '{version}' for model '{name}'")
+        fd, tmp_path = tempfile.mkstemp(dir=self._model_dir(name))
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self._model_dir(name), CURRENT_FILE))
+
+    def publish(self, name, source_path, make_current=True):
+        """
+        Publishes a joblib/pickle file as a new version of `name` and returns the version id.
+        Legacy pickles that reference classes via __main__ are re-dumped against their real module.
+        """
+        version = file_digest(source_path)[:12]
+        version_dir = os.path.join(self._model_dir(name), version)
+
+        if not os.path.isfile(os.path.join(version_dir, MANIFEST_FILE)):
+            os.makedirs(self._model_dir(name), exist_ok=True)
+            with legacy_class_aliases():
+                artifact = joblib.load(source_path)
+
+            staging_dir = tempfile.mkdtemp(dir=self._model_dir(name), prefix='.publish-')
+            try:
+                joblib.dump(artifact, os.path.join(staging_dir, ARTIFACT_FILE))
+                compiled = None
+                try:
+                    compiled = compile_model(_compile_target(artifact))
+                    compiled.save(os.path.join(staging_dir, COMPILED_DIR))
+                except (TypeError, ValueError, AttributeError):
+                    pass  # not a tree ensemble (feature lists, encoders, ...)
+
+                manifest = {
+                    'name': name,
+                    'version': version,
+                    'source': os.path.abspath(source_path),
+                    'source_sha256': file_digest(source_path),
+                    'artifact_type': f"{type(artifact).__module__}.{type(artifact).__name__}",
+                    'compiled': compiled is not None,
+                    'published_at': datetime.utcnow().isoformat() + 'Z',
+                }
+                with open(os.path.join(staging_dir, MANIFEST_FILE), 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                # Renaming the fully written directory makes the version appear atomically.
+                os.rename(staging_dir, version_dir)
+                print(f"✅ Published {name} version {version}")
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                # Losing the rename race to another worker publishing the same version is fine.
+                if not os.path.isfile(os.path.join(version_dir, MANIFEST_FILE)):
+                    raise
+
+        if make_current:
+            self.set_current(name, version)
+        return version
+
+    def import_legacy(self, sources):
+        """Publishes flat ./models/*.pkl files for any model that has no current version yet."""
+        for name, path in sources.items():
+            if self.current_version(name) is None:
+                self.publish(name, path)
+
+    def load(self, name, version=None):
+        """Loads a version (the current one by default), wiring compiled node tables in as the fast path."""
+        version = version or self.current_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No published version for model '{name}' in {self.root}")
+        version_dir = os.path.join(self._model_dir(name), version)
+
+        rss_before = resident_bytes()
+        start = time.perf_counter()
+        artifact = joblib.load(os.path.join(version_dir, ARTIFACT_FILE), mmap_mode='r')
+
+        mapped_bytes = 0
+        compiled_dir = os.path.join(version_dir, COMPILED_DIR)
+        if os.path.isdir(compiled_dir):
+            compiled = CompiledTreeEnsemble.load(compiled_dir, mmap_mode='r')
+            mapped_bytes = sum(array.nbytes for array in compiled.arrays.values())
+            if isinstance(artifact, AnomalyDetectorWithReason):
+                artifact.model = FastPathModel(artifact.model, compiled)
+            else:
+                artifact = FastPathModel(artifact, compiled)
+
+        load_seconds = time.perf_counter() - start
+        rss_after = resident_bytes()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        loaded = LoadedModel(name, version, artifact, load_seconds, rss_delta, mapped_bytes)
+        print(f"✅ Loaded {name}@{version} in {loaded.stats()['load_ms']} ms "
+              f"(rss +{rss_delta if rss_delta is not None else '?'} bytes, {mapped_bytes} bytes mapped)")
+        return loaded
+
+
+if __name__ == '__main__':
+    # Usage: python model_registry.py publish <name> <path>   |   python model_registry.py list
+    registry = ModelRegistry(os.getenv('MODEL_REGISTRY_DIR', './models/registry'))
+    if len(sys.argv) == 4 and sys.argv[1] == 'publish':
+        print(registry.publish(sys.argv[2], sys.argv[3]))
+    else:
+        for model_name in sorted(os.listdir(registry.root)):
+            print(model_name, 'current:', registry.current_version(model_name), 'versions:', registry.versions(model_name))
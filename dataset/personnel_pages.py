@@ -0,0 +1,160 @@
+import re
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from dashboard_pipeline import is_missing, name_lookup
+
+# Columns the personnel list renders. Anything else has to be asked for with ?fields=.
+LIST_FIELDS = ['employee_id', 'name', 'role', 'designation', 'reporting_manager']
+# Never returned, whatever ?fields= asks for.
+HIDDEN_FIELDS = {'_id', 'password'}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+
+def parse_fields(raw):
+    """?fields= -> None for full documents ('all'), otherwise the list columns plus the requested ones."""
+    if raw and raw.strip().lower() == 'all':
+        return None
+    extra = [f.strip() for f in (raw or '').split(',') if f.strip() and f.strip() not in HIDDEN_FIELDS]
+    return LIST_FIELDS + [f for f in extra if f not in LIST_FIELDS]
+
+
+# Cursors are opaque to clients. Records with a string employee_id are walked first, ordered by
+# employee_id ('e:<employee_id>'); the few without one (e.g. CSV rows imported without an ID)
+# follow, ordered by _id ('o:<_id>'), so every record is reachable whatever its employee_id.
+ID_CURSOR = 'e:'
+OBJECT_ID_CURSOR = 'o:'
+
+# ?role= values and the computed role each one keeps.
+ROLE_FILTERS = {
+    'manager': {'role': 'Manager'},
+    'employee': {'role': {'$ne': 'Manager'}},
+}
+
+
+def encode_cursor(row, by_object_id):
+    return OBJECT_ID_CURSOR + str(row['_id']) if by_object_id else ID_CURSOR + row['employee_id']
+
+
+def decode_cursor(cursor):
+    """cursor -> (by_object_id, after). Raises ValueError for anything fetch_personnel_page did not hand out."""
+    if not cursor:
+        return False, None
+    if cursor.startswith(ID_CURSOR):
+        return False, cursor[len(ID_CURSOR):]
+    if cursor.startswith(OBJECT_ID_CURSOR):
+        try:
+            return True, ObjectId(cursor[len(OBJECT_ID_CURSOR):])
+        except InvalidId:
+            pass
+    raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def personnel_page_pipeline(after=None, limit=DEFAULT_PAGE_SIZE, fields=LIST_FIELDS,
+                            manager_collection_name='manager_users', employee_collection_name='employees',
+                            q=None, role=None, by_object_id=False):
+    """
+    One keyset page of personnel: employees (role forced to 'Manager' when a manager account has
+    the same name) merged with managers that have no employee record. Ordered by employee_id over
+    records that have one, or with `by_object_id` by _id over records that don't. Each branch
+    walks its index from `after` and stops after `limit` rows, so a page costs the same on the
+    first and the last page of the org. `q` keeps names containing it (case-insensitive) and
+    `role` is a ROLE_FILTERS key. Rows keep their _id for the cursor.
+    """
+    if by_object_id:
+        sort_key = '_id'
+        keyset = {'employee_id': {'$not': {'$type': 'string'}}}
+        if after is not None:
+            keyset['_id'] = {'$gt': after}
+    else:
+        sort_key = 'employee_id'
+        keyset = {'employee_id': {'$type': 'string', **({'$gt': after} if after is not None else {})}}
+    if q:
+        keyset['name'] = {'$regex': re.escape(q), '$options': 'i'}
+    role_match = [{'$match': ROLE_FILTERS[role]}] if role else []
+
+    if fields is None:
+        projection = {field: 0 for field in HIDDEN_FIELDS if field != '_id'}
+    else:
+        projection = {'tenure_in_current_role': 1, **{field: 1 for field in fields}}
+    dropped = ['manager_match', 'employee_match', 'is_manager']
+    if fields is not None and 'tenure_in_current_role' not in fields:
+        dropped.append('tenure_in_current_role')
+    computed_role = {'$set': {
+        'role': {'$cond': ['$is_manager', 'Manager',
+                           {'$cond': [{'$in': [{'$ifNull': ['$role', '']}, ['', False]]}, 'Employee', '$role']}]},
+    }}
+
+    return [
+        {'$match': keyset},
+        {'$sort': {sort_key: 1}},
+        {'$project': projection},
+        name_lookup(manager_collection_name, 'manager_match'),
+        {'$set': {'is_manager': {'$gt': [{'$size': '$manager_match'}, 0]}}},
+        computed_role,
+        *role_match,
+        {'$limit': limit},
+        {'$unionWith': {
+            'coll': manager_collection_name,
+            'pipeline': [
+                {'$match': keyset},
+                {'$sort': {sort_key: 1}},
+                {'$project': projection},
+                name_lookup(employee_collection_name, 'employee_match'),
+                {'$match': {'employee_match': {'$size': 0}}},
+                {'$set': {'is_manager': True}},
+                computed_role,
+                *role_match,
+                {'$limit': limit},
+            ],
+        }},
+        {'$sort': {sort_key: 1}},
+        {'$limit': limit},
+        {'$set': {'status': {'$cond': [is_missing('$tenure_in_current_role'), 'In Progress', 'Completed']}}},
+        # Same fallback as before: no designation -> show the role.
+        {'$set': {'designation': {'$cond': [is_missing('$designation'), '$role', '$designation']}}},
+        {'$project': {field: 0 for field in dropped}},
+    ]
+
+
+def fetch_personnel_page(employees_collection, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=LIST_FIELDS,
+                         manager_collection_name='manager_users', q=None, role=None):
+    """
+    Returns (rows, next_cursor); next_cursor is None on the last page. A page that runs out of
+    records with an employee_id is topped up from the ones without. Raises ValueError for a bad cursor.
+    """
+    by_object_id, after = decode_cursor(cursor)
+
+    def page(by_object_id, after, size):
+        pipeline = personnel_page_pipeline(after, size, fields, manager_collection_name, employees_collection.name,
+                                           q, role, by_object_id)
+        return list(employees_collection.aggregate(pipeline))
+
+    rows = []
+    if not by_object_id:
+        rows = page(False, after, limit)
+        if len(rows) < limit:
+            by_object_id, after = True, None
+    if by_object_id:
+        rows += page(True, after, limit - len(rows))
+
+    next_cursor = encode_cursor(rows[-1], by_object_id) if len(rows) == limit else None
+    for row in rows:
+        row.pop('_id', None)
+    return rows, next_cursor
+
+
+def iter_personnel(employees_collection, fields=LIST_FIELDS, batch_size=EXPORT_BATCH_SIZE,
+                   manager_collection_name='manager_users', q=None, role=None):
+    """Yields every personnel row, one keyset page at a time, for full exports."""
+    cursor = None
+    while True:
+        rows, cursor = fetch_personnel_page(employees_collection, cursor, batch_size, fields, manager_collection_name,
+                                            q, role)
+        yield from rows
+        if cursor is None:
+            break
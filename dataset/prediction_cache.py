@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+from cachetools import LRUCache
+
+
+def fingerprint_inputs(model_version, *matrices):
+    """
+    Hashes the model version together with the exact model input matrices.
+    Any change to a model-relevant field changes the fingerprint; edits to other fields do not.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(model_version).encode('utf-8'))
+    for matrix in matrices:
+        digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+
+class LocalPredictionBackend:
+    """Bounded in-process LRU store. Entries are evicted least-recently-used first."""
+
+    def __init__(self, maxsize=2048):
+        self._entries = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, employee_id):
+        with self._lock:
+            return self._entries.get(employee_id)
+
+    def set(self, employee_id, entry):
+        with self._lock:
+            self._entries[employee_id] = entry
+
+    def delete(self, employee_id):
+        with self._lock:
+            self._entries.pop(employee_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisPredictionBackend:
+    """Shared store so every worker sees the same cached predictions and invalidations."""
+
+    def __init__(self, url, ttl=24 * 3600, prefix='prediction:'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def get(self, employee_id):
+        raw = self._redis.get(self._prefix + str(employee_id))
+        return json.loads(raw) if raw else None
+
+    def set(self, employee_id, entry):
+        self._redis.set(self._prefix + str(employee_id), json.dumps(entry), ex=self._ttl)
+
+    def delete(self, employee_id):
+        self._redis.delete(self._prefix + str(employee_id))
+
+    def clear(self):
+        for key in self._redis.scan_iter(self._prefix + '*'):
+            self._redis.delete(key)
+
+
+class PredictionCache:
+    """
+    Caches model predictions per employee_id alongside the fingerprint of the inputs they were
+    computed from. A lookup only hits when the stored fingerprint matches the current document,
+    and write routes call invalidate() so stale entries are dropped straight away.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalPredictionBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, employee_id, fingerprint):
+        if employee_id is None:
+            return None
+        try:
+            entry = self.backend.get(employee_id)
+        except Exception as e:
+            print(f"⚠️ Prediction cache read failed: {e}")
+            entry = None
+        if entry and entry.get('fingerprint') == fingerprint:
+            self.hits += 1
+            return entry['predictions']
+        self.misses += 1
+        return None
+
+    def set(self, employee_id, fingerprint, predictions):
+        if employee_id is None:
+            return
+        try:
+            self.backend.set(employee_id, {'fingerprint': fingerprint, 'predictions': predictions})
+        except Exception as e:
+            print(f"⚠️ Prediction cache write failed: {e}")
+
+    def invalidate(self, employee_id):
+        try:
+            self.backend.delete(employee_id)
+        except Exception as e:
+            print(f"⚠️ Prediction cache invalidation failed: {e}")
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def create_prediction_cache():
+    """
+    Builds the cache from the environment: PREDICTION_CACHE_REDIS_URL selects the shared Redis
+    backend, otherwise an in-process LRU of PREDICTION_CACHE_SIZE entries is used.
+    """
+    redis_url = os.getenv('PREDICTION_CACHE_REDIS_URL')
+    if redis_url:
+        ttl = int(os.getenv('PREDICTION_CACHE_TTL', 24 * 3600))
+        return PredictionCache(RedisPredictionBackend(redis_url, ttl=ttl))
+    return PredictionCache(LocalPredictionBackend(maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', 2048))))
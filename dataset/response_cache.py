@@ -0,0 +1,242 @@
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+
+from cachetools import TTLCache
+from flask import Response, make_response, request
+
+
+VERSIONS_COLLECTION = 'response_cache_versions'
+
+
+class LocalVersionStore:
+    """In-process version counters. Only for tests: a bump here is invisible to other processes."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def versions(self, names):
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class MongoVersionStore:
+    """Version counters in a Mongo collection, shared by every worker and by the maintenance scripts."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def versions(self, names):
+        found = {doc['_id']: doc.get('version', 0) for doc in self._collection.find({'_id': {'$in': list(names)}})}
+        return [found.get(name, 0) for name in names]
+
+    def bump(self, name):
+        self._collection.update_one({'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+
+
+class RedisVersionStore:
+    """Version counters in Redis (one MGET per request)."""
+
+    def __init__(self, url, prefix='response_cache:'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def versions(self, names):
+        values = self._redis.mget([f"{self._prefix}version:{name}" for name in names])
+        return [int(value) if value else 0 for value in values]
+
+    def bump(self, name):
+        self._redis.incr(f"{self._prefix}version:{name}")
+
+
+class LocalResponseBackend:
+    """
+    In-process TTL/LRU body store. Safe with several workers: bodies are keyed by the shared
+    versions, so a worker can only ever serve a body for the current versions.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+
+
+class RedisResponseBackend:
+    """Bodies in Redis, shared by every worker."""
+
+    def __init__(self, url, ttl=300, prefix='response_cache:'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._redis.hgetall(self._prefix + key)
+        if not raw:
+            return None
+        return {'status': int(raw[b'status']), 'mimetype': raw[b'mimetype'].decode('utf-8'), 'body': raw[b'body']}
+
+    def set(self, key, entry):
+        pipe = self._redis.pipeline()
+        pipe.hset(self._prefix + key, mapping=entry)
+        pipe.expire(self._prefix + key, self._ttl)
+        pipe.execute()
+
+
+class ResponseCache:
+    """
+    Caches whole GET responses per endpoint and query string. Each endpoint declares the
+    collections it reads; write routes (and the scripts that write those collections) bump()
+    their version counters. The ETag is derived from the endpoint, arguments, current versions
+    and the current `ttl`-second epoch, so a conditional request is answered with 304 after
+    reading the counters alone, a changed version simply misses, and every client revalidates
+    against a fresh body at least once per epoch even if a write was never bumped.
+    """
+
+    def __init__(self, backend=None, version_store=None, ttl=300):
+        self.backend = backend or LocalResponseBackend(ttl=ttl)
+        self.version_store = version_store or LocalVersionStore()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bypassed = 0
+
+    def bump(self, *collections):
+        for name in collections:
+            try:
+                self.version_store.bump(name)
+            except Exception as e:
+                print(f"⚠️ Response cache version bump failed for '{name}': {e}")
+
+    def etag(self, endpoint, collections):
+        args = sorted(request.args.items(multi=True))
+        versions = self.version_store.versions(collections)
+        epoch = int(time.time() // self.ttl)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((endpoint, args, list(zip(collections, versions)), epoch)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def cached(self, endpoint, collections, bypass=None, coalescer=None):
+        """
+        Decorator for a GET view reading `collections`. `bypass` is an optional callable; when it
+        returns True the request is served uncached (e.g. streamed exports). With a SingleFlight
+        `coalescer`, concurrent misses for the same ETag share one run of the view; keying on the
+        ETag means a request arriving after a version bump never joins a pre-write computation.
+        Only use a coalescer on views that do not stream.
+        """
+        collections = list(collections)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if bypass is not None and bypass():
+                    self.bypassed += 1
+                    return view(*args, **kwargs)
+                try:
+                    # Versions are read before the view runs: a write landing mid-request bumps
+                    # them, so whatever this request stores is keyed under the superseded version.
+                    tag = self.etag(endpoint, collections)
+                except Exception as e:
+                    print(f"⚠️ Response cache unavailable, serving {endpoint} uncached: {e}")
+                    self.bypassed += 1
+                    return view(*args, **kwargs)
+
+                if request.if_none_match.contains(tag):
+                    self.not_modified += 1
+                    response = Response(status=304)
+                    response.set_etag(tag)
+                    return response
+
+                entry = self._get(tag)
+                if entry is not None:
+                    self.hits += 1
+                    response = Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+                elif coalescer is None:
+                    self.misses += 1
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    self._set(tag, {'status': response.status_code, 'mimetype': response.mimetype,
+                                    'body': response.get_data()})
+                else:
+                    self.misses += 1
+                    # Responses are mutable, so every waiter builds its own from the leader's body.
+                    body, status, mimetype = coalescer.do((endpoint, tag), lambda: self._render(view, args, kwargs))
+                    response = Response(body, status=status, mimetype=mimetype)
+                    if status != 200:
+                        return response
+                    self._set(tag, {'status': status, 'mimetype': mimetype, 'body': body})
+                response.set_etag(tag)
+                # Let browsers keep the body but revalidate it on every load.
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _render(view, args, kwargs):
+        response = make_response(view(*args, **kwargs))
+        return response.get_data(), response.status_code, response.mimetype
+
+    def _get(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ Response cache read failed: {e}")
+            return None
+
+    def _set(self, key, entry):
+        try:
+            self.backend.set(key, entry)
+        except Exception as e:
+            print(f"⚠️ Response cache write failed: {e}")
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified,
+                'bypassed': self.bypassed}
+
+
+def create_version_store(db):
+    """Shared version counters: Redis when RESPONSE_CACHE_REDIS_URL is set, otherwise Mongo."""
+    redis_url = os.getenv('RESPONSE_CACHE_REDIS_URL')
+    if redis_url:
+        return RedisVersionStore(redis_url)
+    return MongoVersionStore(db[VERSIONS_COLLECTION])
+
+
+def bump_versions(db, *collections):
+    """For scripts that write collections behind the app's back."""
+    store = create_version_store(db)
+    for name in collections:
+        store.bump(name)
+
+
+def create_response_cache(db):
+    """
+    Version counters always live in shared storage (see create_version_store). Bodies go to
+    Redis when RESPONSE_CACHE_REDIS_URL is set, otherwise to an in-process cache of
+    RESPONSE_CACHE_SIZE entries. RESPONSE_CACHE_TTL bounds both body lifetime and ETag validity.
+    """
+    ttl = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+    redis_url = os.getenv('RESPONSE_CACHE_REDIS_URL')
+    if redis_url:
+        backend = RedisResponseBackend(redis_url, ttl=ttl)
+    else:
+        backend = LocalResponseBackend(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 256)), ttl=ttl)
+    return ResponseCache(backend, create_version_store(db), ttl=ttl)
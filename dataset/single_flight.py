@@ -0,0 +1,74 @@
+import threading
+from collections import Counter
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the function, callers
+    arriving while it is in flight wait for it and share its result (or exception). Nothing is
+    kept once the call finishes, so this is not a cache. Per process; each worker coalesces its
+    own requests.
+    """
+
+    def __init__(self, wait_timeout=60):
+        self.wait_timeout = wait_timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+        self.max_waiters = 0
+        self.coalesced_by_key = Counter()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                self.coalesced_by_key[key[0] if isinstance(key, tuple) else key] += 1
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The leader is stuck; don't hold this request hostage to it.
+            with self._lock:
+                self.wait_timeouts += 1
+            return fn()
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self.max_waiters = max(self.max_waiters, call.waiters)
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'max_waiters': self.max_waiters,
+                'wait_timeouts': self.wait_timeouts,
+                'coalesced_by_endpoint': dict(self.coalesced_by_key),
+            }
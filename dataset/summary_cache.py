@@ -0,0 +1,103 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+
+def normalize_feedback(text):
+    """Unicode-normalizes the text and collapses whitespace, so cosmetic edits still share a key."""
+    text = unicodedata.normalize('NFKC', str(text))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def summary_key(text, prompt_version):
+    digest = hashlib.sha256()
+    digest.update(str(prompt_version).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_feedback(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Content-addressed store of feedback summaries, persisted in Mongo.
+
+    Entries are keyed by a hash of the normalized feedback text and the prompt version, so they
+    are shared across employees and workers and never go stale: editing the feedback or the
+    prompt simply produces a new key. A TTL index on 'expires_at' ages entries out and the
+    collection is trimmed back to `max_entries` (least recently used first) as it grows.
+    """
+
+    def __init__(self, collection, prompt_version, ttl_seconds=30 * 24 * 3600, max_entries=50000, trim_every=100):
+        self.collection = collection
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        try:
+            collection.create_index('key', unique=True)
+            collection.create_index('expires_at', expireAfterSeconds=0)
+            collection.create_index('last_used_at')
+        except Exception as e:
+            print(f"⚠️ Could not create summary cache indexes: {e}")
+
+    def key(self, text):
+        return summary_key(text, self.prompt_version)
+
+    def get(self, text):
+        now = datetime.utcnow()
+        try:
+            entry = self.collection.find_one_and_update(
+                {'key': self.key(text), 'expires_at': {'$gt': now}},
+                {'$set': {'last_used_at': now}},
+                projection={'summary': 1, '_id': 0}
+            )
+        except Exception as e:
+            print(f"⚠️ Summary cache read failed: {e}")
+            entry = None
+        if entry:
+            self.hits += 1
+            return entry['summary']
+        self.misses += 1
+        return None
+
+    def set(self, text, summary):
+        now = datetime.utcnow()
+        try:
+            self.collection.update_one(
+                {'key': self.key(text)},
+                {'$set': {
+                    'summary': summary,
+                    'prompt_version': self.prompt_version,
+                    'created_at': now,
+                    'last_used_at': now,
+                    'expires_at': now + timedelta(seconds=self.ttl_seconds),
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # another worker stored the same summary first
+        except Exception as e:
+            print(f"⚠️ Summary cache write failed: {e}")
+            return
+        self._writes += 1
+        if self._writes % self.trim_every == 0:
+            self.trim()
+
+    def trim(self):
+        """Deletes the least recently used entries beyond max_entries."""
+        try:
+            excess = self.collection.count_documents({}) - self.max_entries
+            if excess > 0:
+                stale = [doc['_id'] for doc in self.collection.find({}, {'_id': 1}).sort('last_used_at', 1).limit(excess)]
+                self.collection.delete_many({'_id': {'$in': stale}})
+        except Exception as e:
+            print(f"⚠️ Summary cache trim failed: {e}")
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
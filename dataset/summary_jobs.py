@@ -0,0 +1,122 @@
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class SummaryJobQueue:
+    """
+    Runs feedback summarization on a small background thread pool so report requests can return
+    their predictions straight away. Each job gets an unguessable id which the client polls
+    (or streams) for the summary.
+
+    Jobs are tracked in memory for the worker that accepted them and mirrored to a Mongo
+    collection, so a poll that lands on another gunicorn worker still finds the result.
+    Mirrored jobs are looked up through a unique index on 'job_id' and removed by Mongo through
+    a TTL index on 'expires_at'.
+    """
+
+    def __init__(self, summarize, collection=None, max_workers=4, ttl_seconds=3600):
+        self.summarize = summarize
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        if collection is not None:
+            try:
+                collection.create_index('expires_at', expireAfterSeconds=0)
+            except Exception as e:
+                print(f"⚠️ Could not create TTL index for summary jobs: {e}")
+            try:
+                # Every mirror write and cross-worker poll looks a job up by job_id.
+                collection.create_index('job_id', unique=True)
+            except Exception as e:
+                print(f"⚠️ Could not create job_id index for summary jobs: {e}")
+
+    def submit(self, payload, summarize=None):
+        """
+        Queues `payload` (normally the feedback text) for summarization and returns the job id.
+        `summarize` overrides the queue's default function for this job.
+        """
+        job_id = secrets.token_urlsafe(16)
+        job = {
+            'job_id': job_id,
+            'status': PENDING,
+            'feedback_summary': None,
+            'created_at': datetime.utcnow(),
+            'expires_at': datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+            'done': threading.Event(),
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._mirror(job)
+        self._executor.submit(self._run, job, payload, summarize or self.summarize)
+        return job_id
+
+    def _run(self, job, payload, summarize):
+        try:
+            summary = summarize(payload)
+            # summarize_feedback_gemini reports errors as text rather than raising
+            job['status'] = FAILED if str(summary).startswith('❌') else DONE
+            job['feedback_summary'] = summary
+        except Exception as e:
+            job['status'] = FAILED
+            job['feedback_summary'] = f"❌ Summary Error: {str(e)}"
+        job['finished_at'] = datetime.utcnow()
+        self._mirror(job)
+        job['done'].set()
+
+    def _mirror(self, job):
+        if self.collection is None:
+            return
+        try:
+            self.collection.update_one({'job_id': job['job_id']},
+                                       {'$set': {k: v for k, v in job.items() if k != 'done'}},
+                                       upsert=True)
+        except Exception as e:
+            print(f"⚠️ Could not store summary job {job['job_id']}: {e}")
+
+    def _prune(self):
+        now = datetime.utcnow()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job['expires_at'] < now]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Returns the public view of a job, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.collection is not None:
+            job = self.collection.find_one({'job_id': job_id}, {'_id': 0})
+        if job is None:
+            return None
+        return {'job_id': job_id, 'status': job['status'], 'feedback_summary': job['feedback_summary']}
+
+    def wait(self, job_id, timeout):
+        """
+        Blocks until the job finishes or `timeout` seconds pass, then returns get(job_id).
+        Jobs owned by another worker are re-read from Mongo once a second.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job['done'].wait(timeout)
+            return self.get(job_id)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.get(job_id)
+            if result is None or result['status'] != PENDING or time.monotonic() >= deadline:
+                return result
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+
+    def stats(self):
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (PENDING, DONE, FAILED)}
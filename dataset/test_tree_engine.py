@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+from bench_tree_engine import MODELS, load_model, model_path, sample_inputs
+from tree_engine import compile_model
+
+ROWS = 2000
+
+
+@pytest.fixture(scope='module', params=sorted(MODELS))
+def models(request):
+    """(pickled estimator, its compiled tables, sample inputs) for each shipped model."""
+    name = request.param
+    for filename in MODELS[name]:
+        if filename and not os.path.exists(model_path(filename)):
+            pytest.skip(f"{name}: {model_path(filename)} is not shipped in this checkout")
+    model, n_features = load_model(name)
+    return model, compile_model(model), sample_inputs(ROWS, n_features)
+
+
+def test_predict_proba_matches_pickle(models):
+    model, compiled, X = models
+    if not hasattr(model, 'predict_proba'):
+        pytest.skip(f"{type(model).__name__} has no predict_proba")
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+
+def test_decision_function_matches_pickle(models):
+    model, compiled, X = models
+    if not hasattr(model, 'decision_function'):
+        pytest.skip(f"{type(model).__name__} has no decision_function")
+    np.testing.assert_allclose(compiled.decision_function(X), model.decision_function(X), atol=1e-9)
+
+
+def test_predict_matches_pickle(models):
+    model, compiled, X = models
+    np.testing.assert_allclose(np.asarray(compiled.predict(X), dtype=np.float64),
+                               np.asarray(model.predict(X), dtype=np.float64), atol=1e-4)
+
+
+def test_single_rows_match_batch(models):
+    # The request path scores one employee at a time.
+    model, compiled, X = models
+    predict = compiled.decision_function if hasattr(model, 'decision_function') else compiled.predict
+    batch = np.asarray(predict(X[:50]), dtype=np.float64)
+    single = np.concatenate([np.asarray(predict(X[i:i + 1]), dtype=np.float64) for i in range(50)])
+    np.testing.assert_allclose(single, batch, atol=1e-9)
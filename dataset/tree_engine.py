@@ -0,0 +1,375 @@
+import json
+import os
+import numpy as np
+
+# Node tables are flat arrays shared by every tree of an ensemble. Leaves point back to themselves,
+# so a fixed number of traversal steps (the deepest tree's depth) lands every row on a leaf.
+ARRAY_FIELDS = ['feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots', 'tree_group']
+
+# Upper bound on rows x trees traversed at once, which keeps the working set for large batches bounded.
+MAX_CELLS_PER_CHUNK = 2_000_000
+
+
+def _average_path_length(n_samples):
+    """Average path length of an unsuccessful BST search, as used by IsolationForest."""
+    n = np.asarray(n_samples, dtype=np.float64)
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    mask = n > 2
+    result[mask] = 2.0 * (np.log(n[mask] - 1.0) + np.euler_gamma) - 2.0 * (n[mask] - 1.0) / n[mask]
+    return result
+
+
+def _node_depths(left, right):
+    depths = np.zeros(len(left), dtype=np.float64)
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        for child in (left[node], right[node]):
+            if child != -1:
+                depths[child] = depths[node] + 1
+                stack.append(child)
+    return depths
+
+
+def _max_depth(left, right):
+    return int(_node_depths(left, right).max()) if len(left) else 0
+
+
+class _TableBuilder:
+    """Accumulates per-tree node arrays into one flat, ensemble-wide node table."""
+
+    def __init__(self, n_outputs):
+        self.n_outputs = n_outputs
+        self.parts = {name: [] for name in ['feature', 'threshold', 'left', 'right', 'missing_left', 'value']}
+        self.roots = []
+        self.tree_group = []
+        self.offset = 0
+        self.max_depth = 0
+
+    def add_tree(self, feature, threshold, left, right, missing_left, value, group=0):
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        n_nodes = len(left)
+        is_leaf = left == -1
+        self_index = np.arange(n_nodes, dtype=np.int64)
+
+        self.max_depth = max(self.max_depth, _max_depth(left, right))
+        self.parts['feature'].append(np.where(is_leaf, 0, feature).astype(np.int64))
+        self.parts['threshold'].append(np.where(is_leaf, 0.0, threshold).astype(np.float64))
+        self.parts['left'].append(np.where(is_leaf, self_index, left) + self.offset)
+        self.parts['right'].append(np.where(is_leaf, self_index, right) + self.offset)
+        self.parts['missing_left'].append(np.asarray(missing_left, dtype=bool))
+        self.parts['value'].append(np.asarray(value, dtype=np.float64).reshape(n_nodes, self.n_outputs))
+        self.roots.append(self.offset)
+        self.tree_group.append(group)
+        self.offset += n_nodes
+
+    def arrays(self):
+        arrays = {name: np.concatenate(parts) for name, parts in self.parts.items()}
+        arrays['roots'] = np.asarray(self.roots, dtype=np.int64)
+        arrays['tree_group'] = np.asarray(self.tree_group, dtype=np.int64)
+        return arrays
+
+
+def _sklearn_missing_left(tree):
+    missing = getattr(tree, 'missing_go_to_left', None)
+    return np.zeros(tree.node_count, dtype=bool) if missing is None else np.asarray(missing, dtype=bool)
+
+
+def _compile_sklearn_forest(model, kind):
+    from sklearn.tree import BaseDecisionTree
+    estimators = [model] if isinstance(model, BaseDecisionTree) else list(model.estimators_)
+    classifier = kind == 'forest_classifier'
+    n_outputs = len(model.classes_) if classifier else 1
+    builder = _TableBuilder(n_outputs)
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        if classifier:
+            value = tree.value[:, 0, :]
+            totals = value.sum(axis=1, keepdims=True)
+            value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+        else:
+            value = tree.value[:, 0, 0]
+        builder.add_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                         _sklearn_missing_left(tree), value)
+
+    meta = {'kind': kind, 'strict': False, 'n_features': int(model.n_features_in_),
+            'n_outputs': n_outputs, 'max_depth': builder.max_depth}
+    if classifier:
+        meta['classes'] = np.asarray(model.classes_).tolist()
+    return builder.arrays(), meta
+
+
+def _compile_gradient_boosting(model):
+    builder = _TableBuilder(1)
+    for stage in model.estimators_[:, 0]:
+        tree = stage.tree_
+        builder.add_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                         _sklearn_missing_left(tree), tree.value[:, 0, 0])
+
+    init = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+    meta = {'kind': 'gradient_boosting_regressor', 'strict': False, 'n_features': int(model.n_features_in_),
+            'n_outputs': 1, 'max_depth': builder.max_depth, 'init': init,
+            'learning_rate': float(model.learning_rate)}
+    return builder.arrays(), meta
+
+
+def _compile_isolation_forest(model):
+    builder = _TableBuilder(1)
+    for estimator, features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        left, right = tree.children_left, tree.children_right
+        # Leaf value is the expected path length: depth reached plus the correction for unsplit samples.
+        value = _node_depths(left, right) + _average_path_length(tree.n_node_samples)
+        feature = np.where(tree.feature >= 0, np.asarray(features)[np.maximum(tree.feature, 0)], 0)
+        builder.add_tree(feature, tree.threshold, left, right, _sklearn_missing_left(tree), value)
+
+    meta = {'kind': 'isolation_forest', 'strict': False, 'n_features': int(model.n_features_in_),
+            'n_outputs': 1, 'max_depth': builder.max_depth, 'offset': float(model.offset_),
+            'normalizer': float(len(model.estimators_) * _average_path_length([model.max_samples_])[0])}
+    return builder.arrays(), meta
+
+
+def _compile_xgboost(model):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Unsupported xgboost booster: {learner['gradient_booster']['name']}")
+
+    params = learner['learner_model_param']
+    objective = learner['objective']['name']
+    trees = learner['gradient_booster']['model']['trees']
+    tree_info = learner['gradient_booster']['model']['tree_info']
+    n_groups = max(int(params.get('num_class', 0)), 1)
+
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        parallel = int(learner['gradient_booster']['model']['gbtree_model_param']['num_parallel_tree'])
+        trees = trees[:(best_iteration + 1) * n_groups * parallel]
+
+    builder = _TableBuilder(1)
+    for tree, group in zip(trees, tree_info):
+        if any(tree.get('split_type', [])):
+            raise ValueError("Categorical xgboost splits are not supported")
+        builder.add_tree(tree['split_indices'], tree['split_conditions'], tree['left_children'],
+                         tree['right_children'], tree['default_left'], tree['split_conditions'], group)
+
+    base_score = float(params['base_score'])
+    if objective == 'binary:logistic':
+        base_margin = float(np.log(base_score / (1.0 - base_score)))
+    else:
+        base_margin = base_score
+
+    meta = {'kind': 'xgboost', 'strict': True, 'n_features': int(params['num_feature']),
+            'n_outputs': 1, 'max_depth': builder.max_depth, 'objective': objective,
+            'n_groups': n_groups, 'base_margin': base_margin}
+    classes = getattr(model, 'classes_', None)
+    if classes is not None:
+        meta['classes'] = np.asarray(classes).tolist()
+    return builder.arrays(), meta
+
+
+def compile_model(model):
+    """
+    Flattens a fitted tree ensemble into a CompiledTreeEnsemble.
+    Supports sklearn decision trees, random/extra forests, gradient boosting regressors,
+    isolation forests, and xgboost gbtree models.
+    """
+    from sklearn.ensemble import (ExtraTreesClassifier, ExtraTreesRegressor, GradientBoostingRegressor,
+                                  IsolationForest, RandomForestClassifier, RandomForestRegressor)
+    from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+    if isinstance(model, IsolationForest):
+        arrays, meta = _compile_isolation_forest(model)
+    elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor, DecisionTreeRegressor)):
+        arrays, meta = _compile_sklearn_forest(model, 'forest_regressor')
+    elif isinstance(model, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        arrays, meta = _compile_sklearn_forest(model, 'forest_classifier')
+    elif isinstance(model, GradientBoostingRegressor):
+        arrays, meta = _compile_gradient_boosting(model)
+    elif hasattr(model, 'get_booster'):
+        arrays, meta = _compile_xgboost(model)
+    else:
+        raise TypeError(f"Cannot compile model of type {type(model).__name__}")
+    return CompiledTreeEnsemble(arrays, meta)
+
+
+class CompiledTreeEnsemble:
+    """
+    Array-backed tree ensemble evaluated with NumPy. All trees are traversed together for the whole
+    batch, one depth level per step, and exposes the same predict/predict_proba/decision_function
+    methods as the model it was compiled from.
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        for name in ARRAY_FIELDS:
+            setattr(self, name, arrays[name])
+        self.n_features_in_ = meta['n_features']
+        # xgboost thresholds are float32 to begin with; sklearn compares float32 inputs against float64 thresholds.
+        self._threshold = self.threshold.astype(np.float32) if meta['strict'] else self.threshold
+        self._children = np.column_stack([self.left, self.right]).ravel()
+        if 'classes' in meta:
+            self.classes_ = np.asarray(meta['classes'])
+
+    def apply(self, X):
+        """Returns the global leaf index reached in every tree, shape (n_samples, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_columns = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_columns)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        threshold = self._threshold
+        check_missing = bool(np.isnan(flat_X).any())
+
+        for _ in range(self.meta['max_depth']):
+            x = flat_X[row_offsets + self.feature[nodes]]
+            if self.meta['strict']:
+                go_right = ~(x < threshold[nodes])
+            else:
+                go_right = ~(x <= threshold[nodes])
+            if check_missing:
+                go_right = np.where(np.isnan(x), ~self.missing_left[nodes], go_right)
+            nodes = self._children[nodes * 2 + go_right]
+        return nodes
+
+    def _tree_values(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        chunk = max(1, MAX_CELLS_PER_CHUNK // max(len(self.roots), 1))
+        for start in range(0, X.shape[0], chunk):
+            yield self.value[self.apply(X[start:start + chunk])]
+
+    def _raw(self, X):
+        kind = self.meta['kind']
+        parts = []
+        for values in self._tree_values(X):
+            if kind in ('forest_regressor', 'forest_classifier'):
+                parts.append(values.mean(axis=1))
+            elif kind == 'gradient_boosting_regressor':
+                parts.append(self.meta['init'] + self.meta['learning_rate'] * values[:, :, 0].sum(axis=1, keepdims=True))
+            elif kind == 'isolation_forest':
+                parts.append(values[:, :, 0].sum(axis=1, keepdims=True))
+            else:
+                groups = np.zeros((len(self.roots), self.meta['n_groups']))
+                groups[np.arange(len(self.roots)), self.tree_group] = 1.0
+                parts.append(self.meta['base_margin'] + values[:, :, 0] @ groups)
+        if not parts:
+            width = self.meta['n_groups'] if kind == 'xgboost' else self.meta['n_outputs']
+            return np.zeros((0, width))
+        return np.concatenate(parts)
+
+    def predict_proba(self, X):
+        kind = self.meta['kind']
+        if kind == 'forest_classifier':
+            return self._raw(X)
+        if kind == 'xgboost' and self.meta['objective'] in ('multi:softprob', 'multi:softmax'):
+            margin = self._raw(X)
+            exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        if kind == 'xgboost' and self.meta['objective'] == 'binary:logistic':
+            p = 1.0 / (1.0 + np.exp(-self._raw(X)[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        raise AttributeError(f"{kind} models do not provide predict_proba")
+
+    def score_samples(self, X):
+        depths = self._raw(X)[:, 0]
+        return -(2.0 ** (-depths / self.meta['normalizer']))
+
+    def decision_function(self, X):
+        if self.meta['kind'] != 'isolation_forest':
+            raise AttributeError("decision_function is only available for isolation forests")
+        return self.score_samples(X) - self.meta['offset']
+
+    def predict(self, X):
+        kind = self.meta['kind']
+        if kind == 'isolation_forest':
+            return np.where(self.decision_function(X) < 0, -1, 1)
+        if kind in ('forest_regressor', 'gradient_boosting_regressor'):
+            return self._raw(X)[:, 0]
+        if kind == 'xgboost' and not self.meta['objective'].startswith(('multi:', 'binary:')):
+            return self._raw(X)[:, 0]
+        index = self.predict_proba(X).argmax(axis=1)
+        return self.classes_[index] if hasattr(self, 'classes_') else index
+
+    def save(self, directory):
+        """Writes one .npy file per node array plus meta.json, so arrays can later be memory-mapped."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_FIELDS:
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(self.arrays[name]))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode=None):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode) for name in ARRAY_FIELDS}
+        return cls(arrays, meta)
+
+
+# Below this many rows the NumPy traversal beats the native implementations' fixed per-call overhead;
+# above it the native (multi-threaded C) code is faster, so large batches keep using it.
+FAST_PATH_MAX_ROWS = 32
+
+
+class FastPathModel:
+    """
+    Drop-in wrapper that sends small batches (the per-request, single-employee path) to the
+    compiled ensemble and everything larger to the original model.
+    """
+
+    def __init__(self, model, compiled, max_rows=FAST_PATH_MAX_ROWS):
+        self.model = model
+        self.compiled = compiled
+        self.max_rows = max_rows
+
+    def _pick(self, X):
+        return self.compiled if len(X) <= self.max_rows else self.model
+
+    def predict(self, X):
+        return self._pick(X).predict(X)
+
+    def predict_proba(self, X):
+        return self._pick(X).predict_proba(X)
+
+    def decision_function(self, X):
+        return self._pick(X).decision_function(X)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def with_fast_path(model, name='model'):
+    """Wraps a model in FastPathModel, or returns it untouched if it cannot be compiled."""
+    try:
+        return FastPathModel(model, compile_model(model))
+    except (TypeError, ValueError) as e:
+        print(f"⚠️ {name} runs without the compiled fast path: {e}")
+        return model
+
+
+if __name__ == '__main__':
+    # Export step: flattens the shipped pickles into ./models/compiled/<name>/
+    import joblib
+    from anomaly import AnomalyDetectorWithReason
+    from model_registry import legacy_class_aliases
+
+    sources = {
+        'promotion_model': './models/promotion_model.pkl',
+        'attrition_model': './models/attrition_model.pkl',
+        'anomaly_forest': './models/anomaly_detector_with_reason.pkl',
+    }
+    for name, path in sources.items():
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping {name}: {path} not found")
+            continue
+        with legacy_class_aliases():
+            model = joblib.load(path)
+        if isinstance(model, AnomalyDetectorWithReason):
+            model = model.model
+        compiled = compile_model(model)
+        compiled.save(os.path.join('./models/compiled', name))
+        print(f"✅ Exported {name}: {len(compiled.roots)} trees, {len(compiled.left)} nodes, depth {compiled.meta['max_depth']}")
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, Fragment, useCallback } from 'react';
+import React, { useState, useEffect, Fragment, useCallback, useRef } from 'react';
 import {
   UserCircleIcon,
   ClipboardDocumentListIcon,
@@ -543,6 +543,13 @@ const Chatbot = ({ isChatOpen, setIsChatOpen, token }) => {
   ]);
   const [input, setInput] = useState('');
   const [isBotTyping, setIsBotTyping] = useState(false);
+  const streamRef = useRef(null);
+
+  // Closing the chat or leaving the page aborts an in-flight answer, which cancels it upstream too.
+  useEffect(() => {
+    if (!isChatOpen && streamRef.current) streamRef.current.abort();
+  }, [isChatOpen]);
+  useEffect(() => () => streamRef.current && streamRef.current.abort(), []);
 
   const handleSend = async () => {
     if (input.trim() === '' || isBotTyping) return;
@@ -562,14 +569,19 @@ const Chatbot = ({ isChatOpen, setIsChatOpen, token }) => {
       return;
     }
 
+    const controller = new AbortController();
+    streamRef.current = controller;
+    const botId = Date.now() + 1;
+
     try {
-      const response = await fetch('http://localhost:5000/api/chatbot-query', {
+      const response = await fetch('http://localhost:5000/api/chatbot-query/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${token}`,
         },
         body: JSON.stringify({ query: currentInput }),
+        signal: controller.signal,
       });
 
       if (!response.ok) {
@@ -577,15 +589,46 @@ const Chatbot = ({ isChatOpen, setIsChatOpen, token }) => {
         throw new Error(errorData.error || 'The server returned an error.');
       }
 
-      const data = await response.json();
-      const botReply = data.response || 'Sorry, I couldn’t understand that.';
-      const botMsg = { id: Date.now() + 1, text: botReply, sender: 'bot' };
-      setMessages((prev) => [...prev, botMsg]);
+      // Read the server-sent events as they arrive and grow the bot message token by token.
+      let receivedText = false;
+      const appendText = (text) => {
+        if (!receivedText) {
+          receivedText = true;
+          setIsBotTyping(false);
+          setMessages((prev) => [...prev, { id: botId, text, sender: 'bot' }]);
+        } else {
+          setMessages((prev) => prev.map((m) => (m.id === botId ? { ...m, text: m.text + text } : m)));
+        }
+      };
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+          const event = (frame.match(/^event: (.*)$/m) || [])[1];
+          const data = (frame.match(/^data: (.*)$/m) || [])[1];
+          if (!event || !data) continue;
+          const payload = JSON.parse(data);
+          if (event === 'token') {
+            appendText(payload.text);
+          } else if (event === 'error') {
+            throw new Error(payload.error || 'The server returned an error.');
+          }
+        }
+      }
+      if (!receivedText) appendText('Sorry, I couldn’t understand that.');
 
     } catch (error) {
+      if (error.name === 'AbortError') return;
       setMessages((prev) => [
         ...prev,
-        { id: Date.now() + 1, text: error.message || 'Something went wrong. Try again later.', sender: 'bot' },
+        { id: Date.now() + 2, text: error.message || 'Something went wrong. Try again later.', sender: 'bot' },
       ]);
     } finally {
       setIsBotTyping(false);
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback, useMemo } from 'react';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import {
   UsersIcon,
@@ -11,51 +11,87 @@ import {
   MagnifyingGlassIcon
 } from '@heroicons/react/24/outline';
 
+const PAGE_SIZE = 50;
+const SEARCH_DEBOUNCE_MS = 300;
+// Filter buttons -> the /api/employees/all role parameter ('All' sends none).
+const ROLE_PARAMS = { 'Employees': 'employee', 'Team Leaders': 'manager' };
+
 function EmployeeList() {
   const [users, setUsers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [generatingReportFor, setGeneratingReportFor] = useState(null);
   const [searchQuery, setSearchQuery] = useState('');
+  const [debouncedQuery, setDebouncedQuery] = useState('');
   const [activeFilter, setActiveFilter] = useState('All');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Only the response to the latest search/filter may update the list.
+  const latestRequest = useRef(0);
 
   const navigate = useNavigate();
 
+  // The list is keyset-paginated: pass the previous page's next_cursor to get the next one.
+  // Search and role filtering happen on the server, so they cover the whole organization.
+  const fetchPage = async (cursor, query, filter) => {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+    if (query.trim()) params.set('q', query.trim());
+    if (ROLE_PARAMS[filter]) params.set('role', ROLE_PARAMS[filter]);
+    const response = await fetch(`http://localhost:5000/api/employees/all?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch the employee list');
+    const data = await response.json();
+    if (data.error) throw new Error(data.error);
+    // --- FIX: Ensure every user has a role for consistent display ---
+    const usersWithRoles = (data.users || []).map(u => ({ ...u, role: u.role || 'Employee' }));
+    return { users: usersWithRoles, nextCursor: data.next_cursor };
+  };
+
   const fetchData = useCallback(async () => {
+    const requestId = ++latestRequest.current;
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch('http://localhost:5000/api/employees/all');
-      if (!response.ok) throw new Error('Failed to fetch the employee list');
-      const data = await response.json();
-      if (data.error) throw new Error(data.error);
-      // --- FIX: Ensure every user has a role for consistent display ---
-      const usersWithRoles = data.users.map(u => ({ ...u, role: u.role || 'Employee' }));
-      setUsers(usersWithRoles || []);
+      const page = await fetchPage(null, debouncedQuery, activeFilter);
+      if (requestId !== latestRequest.current) return;
+      setUsers(page.users);
+      setNextCursor(page.nextCursor);
     } catch (err) {
+      if (requestId !== latestRequest.current) return;
       setError(err.message);
       console.error("Error fetching employee list:", err);
     } finally {
-      setLoading(false);
+      if (requestId === latestRequest.current) setLoading(false);
     }
-  }, []);
+  }, [debouncedQuery, activeFilter]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    const requestId = latestRequest.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor, debouncedQuery, activeFilter);
+      if (requestId !== latestRequest.current) return;
+      setUsers(prev => [...prev, ...page.users]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching more personnel:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(searchQuery), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  // Runs on mount and again, from the first page, whenever the search or filter changes.
   useEffect(() => {
     fetchData();
   }, [fetchData]);
 
-  const filteredUsers = useMemo(() => {
-    return users
-      .filter(user => {
-        if (activeFilter === 'Employees') return user.role !== 'Manager';
-        if (activeFilter === 'Team Leaders') return user.role === 'Manager';
-        return true; // 'All'
-      })
-      .filter(user =>
-        user.name.toLowerCase().includes(searchQuery.toLowerCase())
-      );
-  }, [users, searchQuery, activeFilter]);
-
   const handleGenerateReport = async (employeeName) => {
     if (!employeeName) {
       console.error("Employee name is required.");
@@ -172,9 +208,9 @@ function EmployeeList() {
             </div>
           </div>
           <ul role="list" className="divide-y divide-gray-200">
-            {filteredUsers.length > 0 ? (
-              filteredUsers.map((user, index) => (
-                <li key={index} className="flex items-center justify-between p-5 hover:bg-indigo-50/50 transition-colors duration-200">
+            {users.length > 0 ? (
+              users.map((user, index) => (
+                <li key={user.employee_id || index} className="flex items-center justify-between p-5 hover:bg-indigo-50/50 transition-colors duration-200">
                   <div className="flex items-center">
                     <div className={`flex-shrink-0 h-12 w-12 rounded-full flex items-center justify-center ${user.role === 'Manager' ? 'bg-purple-100 text-purple-600' : 'bg-blue-100 text-blue-600'}`}>
                       {user.role === 'Manager' ? <AcademicCapIcon className="h-6 w-6" /> : <BriefcaseIcon className="h-6 w-6" />}
@@ -225,6 +261,18 @@ function EmployeeList() {
               </li>
             )}
           </ul>
+          {nextCursor && (
+            <div className="p-4 border-t border-gray-200 text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="inline-flex items-center gap-x-2 rounded-md bg-white px-3.5 py-2 text-sm font-semibold text-indigo-600 shadow-sm ring-1 ring-inset ring-indigo-200 hover:bg-indigo-50 disabled:text-gray-400"
+              >
+                {loadingMore && <ArrowPathIcon className="h-4 w-4 animate-spin" />}
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
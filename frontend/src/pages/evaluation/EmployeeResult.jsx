@@ -27,6 +27,32 @@ function EmployeeResult() {
     }
   }, [resultData]);
 
+  // The feedback summary is generated in the background; poll for it until the job finishes.
+  const summaryJobId = resultData?.feedback_summary_job_id;
+  const summaryPending = resultData?.feedback_summary_status === 'pending';
+  useEffect(() => {
+    if (!summaryJobId || !summaryPending) return;
+    let cancelled = false;
+    const poll = async () => {
+      try {
+        const response = await fetch(`http://localhost:5000/api/summaries/${summaryJobId}`);
+        const job = await response.json();
+        if (cancelled) return;
+        if (!response.ok) {
+          setResultData((prev) => ({ ...prev, feedback_summary_status: 'failed', feedback_summary: job.error || 'Summary unavailable.' }));
+        } else if (job.status !== 'pending') {
+          setResultData((prev) => ({ ...prev, feedback_summary_status: job.status, feedback_summary: job.feedback_summary }));
+        } else {
+          setTimeout(poll, 2000);
+        }
+      } catch (err) {
+        if (!cancelled) setTimeout(poll, 5000);
+      }
+    };
+    poll();
+    return () => { cancelled = true; };
+  }, [summaryJobId, summaryPending]);
+
   // --- New Feature: Print Functionality ---
   // This function triggers the browser's print dialog.
   const handlePrint = () => {
@@ -200,7 +226,7 @@ function EmployeeResult() {
                 <h2 className="text-xl font-semibold text-gray-800">Feedback Summary</h2>
               </div>
               <pre className="bg-gray-100 p-4 rounded-lg whitespace-pre-wrap text-sm text-gray-700 font-sans h-full">
-                        {feedback_summary.replace(/\*/g, '')}
+                        {feedback_summary ? feedback_summary.replace(/\*/g, '') : 'Generating feedback summary...'}
                     </pre>
             </div>
           </div>
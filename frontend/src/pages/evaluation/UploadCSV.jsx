@@ -58,11 +58,26 @@ function UploadCSV() {
         const formData = new FormData();
         formData.append('file', file);
 
+        // The server ingests the file as it streams in; poll its progress while the upload runs.
+        const uploadId = crypto.randomUUID();
+        const progressTimer = setInterval(async () => {
+            try {
+                const progressResponse = await fetch(`http://localhost:5000/api/uploads/${uploadId}`);
+                if (!progressResponse.ok) return;
+                const progress = await progressResponse.json();
+                const percent = progress.percent != null ? ` (${Math.round(progress.percent)}%)` : '';
+                setStatus({ step: 'uploading', message: `Processing file... ${progress.rows} rows staged${percent}` });
+            } catch (err) {
+                // Progress is best effort; the upload request reports the outcome.
+            }
+        }, 1000);
+
         try {
-            const uploadResponse = await fetch('http://localhost:5000/upload', {
+            const uploadResponse = await fetch(`http://localhost:5000/upload?upload_id=${uploadId}`, {
                 method: 'POST',
                 body: formData,
             });
+            clearInterval(progressTimer);
 
             const uploadData = await uploadResponse.json();
             if (!uploadResponse.ok) {
@@ -85,10 +100,12 @@ function UploadCSV() {
             setEmployeeNames(namesData.names);
             // Pre-select the first employee for better UX, if available
             setSelectedName(namesData.names[0] || '');
-            setStatus({ step: 'success', message: 'File processed. Please select an employee.' });
+            setStatus({ step: 'success', message: `File processed (${uploadData.rows} rows). Please select an employee.` });
 
         } catch (err) {
             setStatus({ step: 'error', message: err.message });
+        } finally {
+            clearInterval(progressTimer);
         }
     };
 